@@ -1,46 +1,47 @@
 """
 OAuth authentication routes for Stripe Connect.
 """
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Request
 from fastapi.responses import RedirectResponse
 
 from app.config import settings
-from app.services.stripe_service import stripe_service
+from app.constants import ACCOUNT_CACHE_KEY, ACCOUNT_CACHE_TTL
+from app.core.routing import ORJSONRoute
+from app.dependencies import ServicesDep
 
-router = APIRouter(prefix="/connect", tags=["OAuth"])
+router = APIRouter(prefix="/connect", tags=["OAuth"], route_class=ORJSONRoute)
 
 
 @router.get("/oauth")
-async def initiate_oauth():
+async def initiate_oauth(services: ServicesDep):
     """
     Initiate Stripe Connect OAuth flow.
     
     This endpoint starts the OAuth process for connecting a seller's account.
+    
+    Args:
+        services: Injected application services
     """
-    try:
-        # Create a Connect account
-        account = stripe_service.create_connect_account(
-            type="express",
-            country="US",
-            capabilities={
-                "card_payments": {"requested": True},
-                "transfers": {"requested": True},
-            }
-        )
-
-        # Create account link for OAuth
-        account_link = stripe_service.create_account_link(
-            account_id=account.id,
-            refresh_url=f"{settings.oauth_redirect_uri}?refresh=true",
-            return_url=settings.oauth_redirect_uri,
-            type="account_onboarding"
-        )
-
-        # Redirect to Stripe Connect OAuth
-        return RedirectResponse(url=account_link.url)
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to initiate OAuth: {str(e)}")
+    # Create a Connect account
+    account = await services.stripe.create_connect_account(
+        type="express",
+        country="US",
+        capabilities={
+            "card_payments": {"requested": True},
+            "transfers": {"requested": True},
+        }
+    )
+
+    # Create account link for OAuth
+    account_link = await services.stripe.create_account_link(
+        account_id=account.id,
+        refresh_url=f"{settings.oauth_redirect_uri}?refresh=true",
+        return_url=settings.oauth_redirect_uri,
+        type="account_onboarding"
+    )
+
+    # Redirect to Stripe Connect OAuth
+    return RedirectResponse(url=account_link.url)
 
 
 @router.get("/oauth/callback")
@@ -50,67 +51,74 @@ async def oauth_callback(request: Request):
     
     This endpoint is called after the user completes the OAuth flow.
     """
-    try:
-        # Get query parameters
-        params = dict(request.query_params)
-
-        # Check if this is a refresh request
-        if params.get("refresh") == "true":
-            # Handle refresh flow
-            return {"message": "OAuth refresh completed", "status": "success"}
-
-        # Handle successful OAuth completion
-        if "code" in params:
-            # In a real application, you would:
-            # 1. Exchange the authorization code for an access token
-            # 2. Store the account information in your database
-            # 3. Associate the account with your user
-
-            return {
-                "message": "OAuth completed successfully",
-                "status": "success",
-                "account_id": params.get("code")  # This would be the account ID in real implementation
-            }
-
-        # Handle OAuth failure
-        if "error" in params:
-            return {
-                "message": "OAuth failed",
-                "status": "error",
-                "error": params.get("error"),
-                "error_description": params.get("error_description")
-            }
-
-        return {"message": "OAuth callback received", "status": "unknown"}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to handle OAuth callback: {str(e)}")
+    # Read query parameters directly from the immutable multi-dict
+    params = request.query_params
+
+    # Check if this is a refresh request
+    if params.get("refresh") == "true":
+        # Handle refresh flow
+        return {"message": "OAuth refresh completed", "status": "success"}
+
+    # Handle successful OAuth completion
+    if "code" in params:
+        # In a real application, you would:
+        # 1. Exchange the authorization code for an access token
+        # 2. Store the account information in your database
+        # 3. Associate the account with your user
+
+        return {
+            "message": "OAuth completed successfully",
+            "status": "success",
+            "account_id": params.get("code")  # This would be the account ID in real implementation
+        }
+
+    # Handle OAuth failure
+    if "error" in params:
+        return {
+            "message": "OAuth failed",
+            "status": "error",
+            "error": params.get("error"),
+            "error_description": params.get("error_description")
+        }
+
+    return {"message": "OAuth callback received", "status": "unknown"}
 
 
 @router.get("/accounts/{account_id}")
-async def get_connect_account(account_id: str):
+async def get_connect_account(
+        account_id: str,
+        services: ServicesDep
+):
     """
     Get Stripe Connect account information.
     
+    Account metadata changes rarely, so responses are cached for a short TTL.
+    
     Args:
         account_id: Stripe Connect account ID
+        services: Injected application services
         
     Returns:
         Account information
     """
-    try:
-        account = stripe_service.get_account(account_id)
-
-        return {
-            "account_id": account.id,
-            "business_type": account.business_type,
-            "country": account.country,
-            "email": account.email,
-            "charges_enabled": account.charges_enabled,
-            "payouts_enabled": account.payouts_enabled,
-            "requirements": account.requirements,
-            "created": account.created
-        }
-
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Account not found: {str(e)}")
+    cache_key = ACCOUNT_CACHE_KEY.format(account_id=account_id)
+    cached = await services.cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    account = await services.stripe.get_account(account_id)
+
+    payload = {
+        "account_id": account.id,
+        "business_type": account.business_type,
+        "country": account.country,
+        "email": account.email,
+        "charges_enabled": account.charges_enabled,
+        "payouts_enabled": account.payouts_enabled,
+        "requirements": account.requirements,
+        "created": account.created
+    }
+
+    await services.cache.set(cache_key, payload, ttl=ACCOUNT_CACHE_TTL)
+
+    return payload
@@ -1,32 +1,83 @@
 """
 Payment-related API routes.
 """
-from typing import Optional
+import asyncio
+import logging
+from typing import Annotated, AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import stripe
+from fastapi import APIRouter, Body, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.models.payment import PaymentCreateRequest, PaymentListResponse
-from app.dependencies import get_payment_service, get_stripe_service
-from app.services.payment_service import PaymentService
-from app.services.stripe_service import StripeService
-from app.constants import ErrorMessages, SuccessMessages, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.models.payment import PaymentCreateRequest, PaymentListResponse, PaymentResponse
+from app.models.wire import PaymentListOut, encode
+from app.config import settings
+from app.core.exceptions import InvalidPaymentIntentError, InvalidWebhookError, PaymentNotFoundError
+from app.core.routing import ORJSONRoute
+from app.dependencies import (
+    Services,
+    IdempotencyKeyHeader,
+    ServicesDep,
+    limit_batch_concurrency,
+    limit_customer_concurrency
+)
+from app.constants import (
+    ErrorMessages,
+    SuccessMessages,
+    DEFAULT_PAGE_SIZE,
+    MAX_BATCH_SIZE,
+    MAX_PAGE_SIZE,
+    PAYMENT_STATUS_CACHE_KEY,
+    PAYMENT_STATUS_CACHE_TTL
+)
+
+logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/payments", tags=["Payments"])
+router = APIRouter(prefix="/payments", tags=["Payments"], route_class=ORJSONRoute)
+
+
+async def _get_live_status(
+        payment_intent_id: str,
+        services: Services
+) -> str:
+    """
+    Get a payment intent status from cache, falling back to Stripe.
+    
+    Args:
+        payment_intent_id: Stripe payment intent ID
+        services: Application services
+        
+    Returns:
+        Payment intent status
+    """
+    cache_key = PAYMENT_STATUS_CACHE_KEY.format(payment_intent_id=payment_intent_id)
+    stripe_status = await services.cache.get(cache_key)
+    if stripe_status is None:
+        # With Redis as the shared layer, skip the in-process copy so the two TTLs don't add up
+        stripe_status = await services.stripe.get_payment_intent_status(
+            payment_intent_id, refresh=services.cache.enabled
+        )
+        await services.cache.set(cache_key, stripe_status, ttl=PAYMENT_STATUS_CACHE_TTL)
+
+    return stripe_status
 
 
 @router.post(
     "/create",
     status_code=status.HTTP_201_CREATED,
     name="Create Payment",
+    dependencies=[Depends(limit_customer_concurrency)],
     responses={
         201: {"description": "Payment created successfully"},
+        429: {"description": "Too many concurrent requests for this customer"},
         500: {"description": "Internal server error"}
     }
 )
 async def create_payment(
         request: PaymentCreateRequest,
+        services: ServicesDep,
         test_mode: bool = Query(False, description="Create a test payment that will be automatically successful"),
-        payment_service: PaymentService = Depends(get_payment_service)
+        idempotency_key: IdempotencyKeyHeader = None
 ) -> dict:
     """
     Create a new payment.
@@ -37,34 +88,145 @@ async def create_payment(
     Args:
         request: Payment creation request with amount, currency, and customer details
         test_mode: If True, creates a test payment that will be automatically successful
-        payment_service: Injected payment service for handling payment operations
+        idempotency_key: Optional Idempotency-Key header, forwarded to Stripe
+        services: Injected application services
         
     Returns:
         dict: Created payment information with client secret for frontend integration
         
     Raises:
-        HTTPException: If payment creation fails
+        stripe.StripeError: If Stripe rejects the request (mapped to a response by the app handler)
     """
-    try:
-        payment = payment_service.create_payment(request, test_mode=test_mode)
+    payment = await services.payment.create_payment(
+        request, test_mode=test_mode, idempotency_key=idempotency_key
+    )
+
+    return {
+        "message": SuccessMessages.PAYMENT_CREATED,
+        "payment": payment.to_response(),
+        "client_secret": payment.stripe_payment_intent_id
+    }
+
+
+@router.post(
+    "/create-batch",
+    status_code=status.HTTP_201_CREATED,
+    name="Create Payments Batch",
+    dependencies=[Depends(limit_batch_concurrency)],
+    responses={
+        201: {"description": "Batch processed; each item reports its own outcome"},
+        429: {"description": "Too many concurrent requests for this customer"}
+    }
+)
+async def create_payments_batch(
+        requests: Annotated[list[PaymentCreateRequest], Body(min_length=1, max_length=MAX_BATCH_SIZE)],
+        services: ServicesDep,
+        test_mode: bool = Query(False, description="Create test payments that will be automatically successful"),
+        idempotency_key: IdempotencyKeyHeader = None
+) -> dict:
+    """
+    Create several payments in one call.
+    
+    The Stripe calls are issued concurrently, at most stripe_batch_concurrency at a
+    time, so a single batch can't take every slot of the Stripe service's shared limit.
+    Every customer in the batch holds a concurrency slot while it runs.
+    A failing item doesn't fail the batch: results keep request order and carry either
+    the created payment or an error message.
+    
+    Args:
+        requests: Payment creation requests (1-100)
+        test_mode: If True, creates test payments that will be automatically successful
+        idempotency_key: Optional Idempotency-Key header; item i uses "<key>-<i>"
+        services: Injected application services
+        
+    Returns:
+        dict: Per-item results in request order
+    """
+    semaphore = asyncio.Semaphore(settings.stripe_batch_concurrency)
+
+    async def create(i: int, r: PaymentCreateRequest):
+        async with semaphore:
+            return await services.payment.create_payment(
+                r,
+                test_mode=test_mode,
+                idempotency_key=f"{idempotency_key}-{i}" if idempotency_key else None
+            )
 
-        return {
-            "message": SuccessMessages.PAYMENT_CREATED,
-            "payment": payment,
-            "client_secret": payment.stripe_payment_intent_id
+    outcomes = await asyncio.gather(
+        *[create(i, r) for i, r in enumerate(requests)],
+        return_exceptions=True
+    )
+
+    results = []
+    for outcome in outcomes:
+        if isinstance(outcome, stripe.StripeError):
+            results.append({"error": outcome.user_message or ErrorMessages.FAILED_TO_CREATE_PAYMENT})
+        elif isinstance(outcome, Exception):
+            logger.error(ErrorMessages.FAILED_TO_CREATE_PAYMENT, exc_info=outcome)
+            results.append({"error": ErrorMessages.FAILED_TO_CREATE_PAYMENT})
+        else:
+            results.append({
+                "payment": outcome.to_response(),
+                "client_secret": outcome.stripe_payment_intent_id
+            })
+
+    return {
+        "message": SuccessMessages.PAYMENTS_BATCH_PROCESSED,
+        "results": results
+    }
+
+
+@router.get(
+    "/ndjson",
+    status_code=status.HTTP_200_OK,
+    name="Stream Payments",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Payments streamed as newline-delimited JSON",
+            "content": {"application/x-ndjson": {}}
         }
+    }
+)
+async def stream_payments(
+        services: ServicesDep,
+        customer_id: Optional[str] = Query(None, description="Customer ID to filter payments"),
+        page: int = Query(1, ge=1, description="Page number"),
+        per_page: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Items per page")
+) -> StreamingResponse:
+    """
+    Stream a page of payments as NDJSON.
+    
+    Each payment is serialized and sent as its own line, so large pages are never
+    buffered as a single body and clients can start parsing the first record early.
+    
+    Args:
+        customer_id: Optional customer ID to filter payments
+        page: Page number (1-based)
+        per_page: Number of items per page (1-100)
+        services: Injected application services
+        
+    Returns:
+        StreamingResponse: One JSON-encoded payment per line
+    """
+    payments = services.payment.iter_payments(
+        customer_id=customer_id,
+        page=page,
+        per_page=per_page
+    )
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"{ErrorMessages.FAILED_TO_CREATE_PAYMENT}: {str(e)}"
-        )
+    async def stream() -> AsyncIterator[bytes]:
+        async for payment in payments:
+            yield encode(payment) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @router.get(
     "/{payment_id}",
     status_code=status.HTTP_200_OK,
     name="Get Payment",
+    response_model=PaymentResponse,
     responses={
         200: {"description": "Payment details retrieved successfully"},
         404: {"description": "Payment not found"}
@@ -72,8 +234,8 @@ async def create_payment(
 )
 async def get_payment(
         payment_id: str,
-        payment_service: PaymentService = Depends(get_payment_service)
-) -> dict:
+        services: ServicesDep
+) -> Response:
     """
     Get payment details by ID.
     
@@ -82,23 +244,20 @@ async def get_payment(
     
     Args:
         payment_id: Unique payment identifier
-        payment_service: Injected payment service for retrieving payment data
+        services: Injected application services
         
     Returns:
-        dict: Payment details including status, amount, and metadata
+        Response: JSON-encoded PaymentResponse
         
     Raises:
         HTTPException: If payment is not found
     """
-    payment = payment_service.get_payment(payment_id)
+    payment = await services.payment.get_payment(payment_id)
 
     if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=ErrorMessages.PAYMENT_NOT_FOUND
-        )
+        raise PaymentNotFoundError()
 
-    return payment
+    return Response(content=encode(payment), media_type="application/json")
 
 
 @router.get(
@@ -114,57 +273,89 @@ async def get_payment(
 )
 async def get_payment_status(
         payment_id: str,
-        payment_service: PaymentService = Depends(get_payment_service),
-        stripe_service: StripeService = Depends(get_stripe_service)
+        services: ServicesDep
 ) -> dict:
     """
     Get payment status from Stripe.
     
-    This endpoint retrieves the current status of a payment directly from Stripe,
-    ensuring the most up-to-date information is available.
+    This endpoint retrieves the current status of a payment from Stripe. Statuses
+    are cached for a few seconds so that polling clients don't hit Stripe on every call.
     
     Args:
         payment_id: Unique payment identifier
-        payment_service: Injected payment service for retrieving payment data
-        stripe_service: Injected Stripe service for retrieving payment status
+        services: Injected application services
         
     Returns:
         dict: Current payment status from Stripe
         
     Raises:
-        HTTPException: If payment is not found or status retrieval fails
+        HTTPException: If payment is not found
+        stripe.StripeError: If status retrieval fails (mapped to a response by the app handler)
     """
-    try:
-        payment = payment_service.get_payment(payment_id)
+    payment = await services.payment.get_payment(payment_id)
 
-        if not payment:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=ErrorMessages.PAYMENT_NOT_FOUND
-            )
+    if not payment:
+        raise PaymentNotFoundError()
 
-        if not payment.stripe_payment_intent_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=ErrorMessages.INVALID_PAYMENT_INTENT
-            )
+    if not payment.stripe_payment_intent_id:
+        raise InvalidPaymentIntentError()
 
-        # Get status from Stripe
-        stripe_status = stripe_service.get_payment_intent_status(payment.stripe_payment_intent_id)
+    stripe_status = await _get_live_status(
+        payment.stripe_payment_intent_id, services
+    )
+
+    return {
+        "payment_id": payment_id,
+        "status": stripe_status
+    }
 
-        return {
-            "payment_id": payment_id,
-            "status": stripe_status
-        }
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"{ErrorMessages.FAILED_TO_GET_PAYMENT_STATUS}: {str(e)}"
+@router.get(
+    "/{payment_id}/full",
+    status_code=status.HTTP_200_OK,
+    name="Get Payment With Status",
+    responses={
+        200: {"description": "Payment details and live status retrieved successfully"},
+        404: {"description": "Payment not found"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def get_payment_full(
+        payment_id: str,
+        services: ServicesDep
+) -> dict:
+    """
+    Get payment details together with its live Stripe status.
+    
+    This endpoint saves clients a second round-trip to the status endpoint.
+    
+    Args:
+        payment_id: Unique payment identifier
+        services: Injected application services
+        
+    Returns:
+        dict: Payment details and current status from Stripe (None without a payment intent)
+        
+    Raises:
+        HTTPException: If payment is not found
+        stripe.StripeError: If status retrieval fails (mapped to a response by the app handler)
+    """
+    payment = await services.payment.get_payment(payment_id)
+
+    if not payment:
+        raise PaymentNotFoundError()
+
+    stripe_status = None
+    if payment.stripe_payment_intent_id:
+        stripe_status = await _get_live_status(
+            payment.stripe_payment_intent_id, services
         )
 
+    return {
+        "payment": payment.to_response(),
+        "status": stripe_status
+    }
+
 
 # Commented out payment cabinet - not using templates
 # @router.get("/cabinet", response_class=HTMLResponse)
@@ -225,82 +416,103 @@ async def get_payment_status(
     }
 )
 async def list_payments(
+        services: ServicesDep,
         customer_id: Optional[str] = Query(None, description="Customer ID to filter payments"),
         page: int = Query(1, ge=1, description="Page number"),
         per_page: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Items per page"),
-        payment_service: PaymentService = Depends(get_payment_service)
-) -> PaymentListResponse:
+        include_status: bool = Query(False, description="Include live Stripe status for each payment")
+) -> Response:
     """
     List payments with pagination.
     
     This endpoint retrieves a paginated list of payments with optional filtering
-    by customer ID. The response includes metadata for pagination.
+    by customer ID. The response includes metadata for pagination. When include_status
+    is set, live Stripe statuses for the page are fetched concurrently; payments
+    whose status can't be fetched are left out of statuses.
     
     Args:
         customer_id: Optional customer ID to filter payments
         page: Page number (1-based)
         per_page: Number of items per page (1-100)
-        payment_service: Injected payment service for retrieving payment data
+        include_status: If True, include live Stripe status keyed by payment ID
+        services: Injected application services
         
     Returns:
-        PaymentListResponse: Paginated list of payments with metadata
+        Response: JSON-encoded PaymentListResponse with pagination metadata
+    """
+    payments = await services.payment.get_payments(
+        customer_id=customer_id,
+        page=page,
+        per_page=per_page
+    )
+
+    total = await services.payment.count_payments(customer_id=customer_id)
+
+    statuses = None
+    if include_status:
+        with_intent = [p for p in payments if p.stripe_payment_intent_id]
+        results = await asyncio.gather(*[
+            _get_live_status(p.stripe_payment_intent_id, services)
+            for p in with_intent
+        ], return_exceptions=True)
+        # A failed lookup (e.g. a deleted intent) drops only that payment's status
+        statuses = {
+            p.id: result
+            for p, result in zip(with_intent, results)
+            if not isinstance(result, BaseException)
+        }
+
+    response = PaymentListOut(
+        payments=payments,
+        total=total,
+        page=page,
+        per_page=per_page,
+        statuses=statuses
+    )
+
+    # Encoded with msgspec; the PaymentListResponse schema above is for the docs only
+    return Response(content=encode(response), media_type="application/json")
+
+@router.post(
+    "/webhook",
+    status_code=status.HTTP_200_OK,
+    name="Stripe Webhook",
+    responses={
+        200: {"description": "Webhook processed successfully"},
+        400: {"description": "Invalid payload or signature"}
+    }
+)
+async def stripe_webhook(
+        request: Request,
+        services: ServicesDep,
+        stripe_signature: Annotated[str, Header(alias="Stripe-Signature")]
+) -> dict:
+    """
+    Handle Stripe webhook events.
+    
+    The raw body is verified against the Stripe-Signature header and handed to the
+    payment service as the verified event; it is never parsed into a request model.
+    
+    Args:
+        request: Incoming request (read for its raw body)
+        stripe_signature: Stripe-Signature header
+        services: Injected application services
+        
+    Returns:
+        dict: Processing confirmation
         
     Raises:
-        HTTPException: If payment listing fails
+        HTTPException: If the payload is malformed or the signature does not verify
     """
-    try:
-        payments = payment_service.get_payments(
-            customer_id=customer_id,
-            page=page,
-            per_page=per_page
-        )
-
-        # Calculate total (in real app, this would come from database)
-        total = len(payment_service._payments)
+    payload = await request.body()
 
-        return PaymentListResponse(
-            payments=payments,
-            total=total,
-            page=page,
-            per_page=per_page
+    try:
+        event = stripe.Webhook.construct_event(
+            payload, stripe_signature, settings.stripe_webhook_secret.get_secret_value()
         )
+    except (ValueError, stripe.SignatureVerificationError):
+        raise InvalidWebhookError()
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"{ErrorMessages.FAILED_TO_LIST_PAYMENTS}: {str(e)}"
-        )
+    await services.payment.process_webhook(event)
 
-# Commented out webhook endpoint - working without webhooks
-# @router.post("/webhook")
-# async def stripe_webhook(request: Request):
-#     """
-#     Handle Stripe webhook events.
-#     
-#     This endpoint processes webhook events from Stripe to update payment statuses.
-#     
-#     Args:
-#         request: FastAPI request object
-#         
-#     Returns:
-#         Webhook processing result
-#     """
-#     try:
-#         # Get the webhook payload
-#         payload = await request.body()
-#         sig_header = request.headers.get("stripe-signature")
-#         
-#         # Verify webhook signature (in real app, implement proper verification)
-#         # event = stripe.Webhook.construct_event(payload, sig_header, settings.stripe_webhook_secret)
-#         
-#         # For prototype, just parse the JSON
-#         import json
-#         event_data = json.loads(payload)
-#         
-#         # Process the webhook event
-#         payment_service.process_webhook(event_data)
-#         
-#         return {"message": "Webhook processed successfully"}
-#         
-#     except Exception as e:
-#         raise HTTPException(status_code=400, detail=f"Webhook processing failed: {str(e)}")
+    return {"message": SuccessMessages.WEBHOOK_PROCESSED}
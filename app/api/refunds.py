@@ -3,28 +3,33 @@ Refund-related API routes.
 """
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
 
+from app.core.exceptions import RefundNotFoundError
+from app.core.routing import ORJSONRoute
 from app.models.refund import RefundCreateRequest, RefundListResponse
-from app.dependencies import get_refund_service
-from app.services.refund_service import RefundService
-from app.constants import ErrorMessages, SuccessMessages, DEFAULT_PAGE_SIZE
+from app.models.wire import RefundListOut, RefundOut, encode, to_wire
+from app.dependencies import IdempotencyKeyHeader, ServicesDep, limit_customer_concurrency
+from app.constants import SuccessMessages, DEFAULT_PAGE_SIZE
 
-router = APIRouter(prefix="/refunds", tags=["Refunds"])
+router = APIRouter(prefix="/refunds", tags=["Refunds"], route_class=ORJSONRoute)
 
 
 @router.post(
     "/create",
     status_code=status.HTTP_201_CREATED,
     name="Create Refund",
+    dependencies=[Depends(limit_customer_concurrency)],
     responses={
         201: {"description": "Refund created successfully"},
+        429: {"description": "Too many concurrent requests for this customer"},
         500: {"description": "Internal server error"}
     }
 )
 async def create_refund(
         request: RefundCreateRequest,
-        refund_service: RefundService = Depends(get_refund_service)
+        services: ServicesDep,
+        idempotency_key: IdempotencyKeyHeader = None
 ) -> dict:
     """
     Create a refund for a payment.
@@ -34,90 +39,78 @@ async def create_refund(
     
     Args:
         request: Refund creation request with payment intent ID and amount
-        refund_service: Injected refund service for creating refunds
+        idempotency_key: Optional Idempotency-Key header, forwarded to Stripe
+        services: Injected application services
         
     Returns:
         dict: Created refund information with details
         
     Raises:
-        HTTPException: If refund creation fails
+        stripe.StripeError: If Stripe rejects the request (mapped to a response by the app handler)
     """
-    try:
-        # Create refund using refund service
-        refund = refund_service.create_refund(
-            payment_intent_id=request.payment_intent_id,
-            amount=request.amount,
-            reason=request.reason
-        )
+    # Create refund using refund service
+    refund = await services.refund.create_refund(
+        payment_intent_id=request.payment_intent_id,
+        amount=request.amount,
+        reason=request.reason,
+        idempotency_key=idempotency_key
+    )
 
-        return {
-            "message": SuccessMessages.REFUND_CREATED,
-            "refund": refund
-        }
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"{ErrorMessages.FAILED_TO_CREATE_REFUND}: {str(e)}"
-        )
+    return {
+        "message": SuccessMessages.REFUND_CREATED,
+        "refund": refund
+    }
 
 
 @router.get("/{refund_id}")
 async def get_refund(
         refund_id: str,
-        refund_service: RefundService = Depends(get_refund_service)
+        services: ServicesDep
 ):
     """
     Get refund details by ID.
     
     Args:
         refund_id: Refund ID
-        refund_service: Injected refund service
+        services: Injected application services
         
     Returns:
         Refund details
     """
-    try:
-        refund = refund_service.get_refund(refund_id)
-        if not refund:
-            raise HTTPException(status_code=404, detail="Refund not found")
+    refund = await services.refund.get_refund(refund_id)
+    if not refund:
+        raise RefundNotFoundError()
 
-        return refund
+    return refund
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Refund not found: {str(e)}")
 
-
-@router.get("/")
+@router.get("/", response_model=RefundListResponse)
 async def list_refunds(
+        services: ServicesDep,
         payment_intent_id: Optional[str] = Query(None, description="Filter by payment intent ID"),
-        limit: int = Query(DEFAULT_PAGE_SIZE, le=100, description="Maximum number of refunds to return"),
-        refund_service: RefundService = Depends(get_refund_service)
-):
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=100, description="Maximum number of refunds to return")
+) -> Response:
     """
     List refunds.
     
     Args:
         payment_intent_id: Filter by payment intent ID
         limit: Maximum number of refunds to return
-        refund_service: Injected refund service
+        services: Injected application services
         
     Returns:
-        List of refunds
+        JSON-encoded RefundListResponse
     """
-    try:
-        refunds = refund_service.list_refunds(
-            payment_intent_id=payment_intent_id,
-            limit=limit
-        )
+    refunds = await services.refund.list_refunds(
+        payment_intent_id=payment_intent_id,
+        limit=limit
+    )
 
-        return RefundListResponse(
-            refunds=refunds,
-            total=len(refunds),
-            has_more=False  # For simplicity, always return False
-        )
+    response = RefundListOut(
+        refunds=to_wire(refunds, RefundOut),
+        total=len(refunds),
+        has_more=False  # For simplicity, always return False
+    )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list refunds: {str(e)}")
+    # Encoded with msgspec; the RefundListResponse schema above is for the docs only
+    return Response(content=encode(response), media_type="application/json")
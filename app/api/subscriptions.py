@@ -3,31 +3,37 @@ Subscription-related API routes.
 """
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
 
+from app.core.exceptions import SubscriptionNotFoundError
+from app.core.routing import ORJSONRoute
 from app.models.subscription import (
     SubscriptionCreateRequest,
-    SubscriptionListResponse
+    SubscriptionListResponse,
+    SubscriptionResponse
 )
-from app.dependencies import get_subscription_service
-from app.services.subscription_service import SubscriptionService
-from app.constants import ErrorMessages, SuccessMessages, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.models.wire import SubscriptionListOut, encode
+from app.dependencies import IdempotencyKeyHeader, ServicesDep, limit_customer_concurrency
+from app.constants import SuccessMessages, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
-router = APIRouter(prefix="/subscriptions", tags=["Subscriptions"])
+router = APIRouter(prefix="/subscriptions", tags=["Subscriptions"], route_class=ORJSONRoute)
 
 
 @router.post(
     "/create",
     status_code=status.HTTP_201_CREATED,
     name="Create Subscription",
+    dependencies=[Depends(limit_customer_concurrency)],
     responses={
         201: {"description": "Subscription created successfully"},
+        429: {"description": "Too many concurrent requests for this customer"},
         500: {"description": "Internal server error"}
     }
 )
 async def create_subscription(
         request: SubscriptionCreateRequest,
-        subscription_service: SubscriptionService = Depends(get_subscription_service)
+        services: ServicesDep,
+        idempotency_key: IdempotencyKeyHeader = None
 ) -> dict:
     """
     Create a new subscription.
@@ -37,34 +43,30 @@ async def create_subscription(
     
     Args:
         request: Subscription creation request with customer and price details
-        subscription_service: Injected subscription service for handling operations
+        idempotency_key: Optional Idempotency-Key header, forwarded to Stripe
+        services: Injected application services
         
     Returns:
         dict: Created subscription information with billing details
         
     Raises:
-        HTTPException: If subscription creation fails
+        stripe.StripeError: If Stripe rejects the request (mapped to a response by the app handler)
     """
-    try:
-        subscription = subscription_service.create_subscription(request)
+    subscription = await services.subscription.create_subscription(
+        request, idempotency_key=idempotency_key
+    )
 
-        return {
-            "message": SuccessMessages.SUBSCRIPTION_CREATED,
-            "subscription": subscription
-        }
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"{ErrorMessages.FAILED_TO_CREATE_SUBSCRIPTION}: {str(e)}"
-        )
+    return {
+        "message": SuccessMessages.SUBSCRIPTION_CREATED,
+        "subscription": subscription.to_response()
+    }
 
 
-@router.get("/{subscription_id}")
+@router.get("/{subscription_id}", response_model=SubscriptionResponse)
 async def get_subscription(
         subscription_id: str,
-        subscription_service: SubscriptionService = Depends(get_subscription_service)
-):
+        services: ServicesDep
+) -> Response:
     """
     Get subscription details by ID.
     
@@ -72,20 +74,20 @@ async def get_subscription(
         subscription_id: Subscription ID
         
     Returns:
-        Subscription details
+        JSON-encoded SubscriptionResponse
     """
-    subscription = subscription_service.get_subscription(subscription_id)
+    subscription = services.subscription.get_subscription(subscription_id)
 
     if not subscription:
-        raise HTTPException(status_code=404, detail="Subscription not found")
+        raise SubscriptionNotFoundError()
 
-    return subscription
+    return Response(content=encode(subscription), media_type="application/json")
 
 
 @router.post("/{subscription_id}/cancel")
 async def cancel_subscription(
         subscription_id: str,
-        subscription_service: SubscriptionService = Depends(get_subscription_service)
+        services: ServicesDep
 ):
     """
     Cancel a subscription.
@@ -96,21 +98,15 @@ async def cancel_subscription(
     Returns:
         Cancelled subscription information
     """
-    try:
-        subscription = subscription_service.cancel_subscription(subscription_id)
-
-        if not subscription:
-            raise HTTPException(status_code=404, detail="Subscription not found")
+    subscription = await services.subscription.cancel_subscription(subscription_id)
 
-        return {
-            "message": "Subscription cancelled successfully",
-            "subscription": subscription
-        }
+    if not subscription:
+        raise SubscriptionNotFoundError()
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to cancel subscription: {str(e)}")
+    return {
+        "message": SuccessMessages.SUBSCRIPTION_CANCELED,
+        "subscription": subscription.to_response()
+    }
 
 
 @router.get(
@@ -124,48 +120,45 @@ async def cancel_subscription(
     }
 )
 async def list_subscriptions(
+        services: ServicesDep,
         customer_id: Optional[str] = Query(None, description="Customer ID to filter subscriptions"),
         page: int = Query(1, ge=1, description="Page number"),
         per_page: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Items per page"),
-        subscription_service: SubscriptionService = Depends(get_subscription_service)
-) -> SubscriptionListResponse:
+        after: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor (overrides page)")
+) -> Response:
     """
     List subscriptions with pagination.
     
     This endpoint retrieves a paginated list of subscriptions with optional filtering
-    by customer ID. The response includes metadata for pagination.
+    by customer ID. The response includes metadata for pagination, including a
+    next_cursor that can be passed back as after for stable keyset pagination.
     
     Args:
         customer_id: Optional customer ID to filter subscriptions
         page: Page number (1-based)
         per_page: Number of items per page (1-100)
-        subscription_service: Injected subscription service for retrieving data
+        after: Cursor (last subscription ID of the previous page)
+        services: Injected application services
         
     Returns:
-        SubscriptionListResponse: Paginated list of subscriptions with metadata
-        
-    Raises:
-        HTTPException: If subscription listing fails
+        Response: JSON-encoded SubscriptionListResponse with pagination metadata
     """
-    try:
-        subscriptions = subscription_service.get_subscriptions(
-            customer_id=customer_id,
-            page=page,
-            per_page=per_page
-        )
-
-        # Calculate total (in real app, this would come from database)
-        total = len(subscription_service._subscriptions)
-
-        return SubscriptionListResponse(
-            subscriptions=subscriptions,
-            total=total,
-            page=page,
-            per_page=per_page
-        )
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"{ErrorMessages.FAILED_TO_LIST_SUBSCRIPTIONS}: {str(e)}"
-        )
+    subscriptions, next_cursor = services.subscription.get_subscriptions(
+        customer_id=customer_id,
+        page=page,
+        per_page=per_page,
+        after=after
+    )
+
+    total = services.subscription.count_subscriptions(customer_id=customer_id)
+
+    response = SubscriptionListOut(
+        subscriptions=subscriptions,
+        total=total,
+        page=page,
+        per_page=per_page,
+        next_cursor=next_cursor
+    )
+
+    # Encoded with msgspec; the SubscriptionListResponse schema above is for the docs only
+    return Response(content=encode(response), media_type="application/json")
@@ -1,45 +1,80 @@
 """
 Configuration settings for the Stripe B2B Payments API.
 """
-import os
-from typing import Optional
+from functools import cached_property, lru_cache
+from typing import Literal
 
-from dotenv import load_dotenv
+from pydantic import SecretStr
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load environment variables from .env file
-load_dotenv()
 
+class Settings(BaseSettings):
+    """Application settings loaded from environment variables and the .env file."""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
-class Settings:
-    """Application settings loaded from environment variables."""
-    
     # Stripe Configuration
-    stripe_publishable_key: str = os.getenv("STRIPE_PUBLISHABLE_KEY", "")
-    stripe_secret_key: str = os.getenv("STRIPE_SECRET_KEY", "")
-    stripe_webhook_secret: str = os.getenv("STRIPE_WEBHOOK_SECRET", "")
-    
+    stripe_publishable_key: str = ""
+    stripe_secret_key: SecretStr = SecretStr("")
+    stripe_webhook_secret: SecretStr = SecretStr("")
+    stripe_max_concurrency: int = 64
+    stripe_rps: float = 25
+    # In-flight Stripe calls per batch request, so one batch can't take every slot above
+    stripe_batch_concurrency: int = 8
+    # Connection errors and 409/5xx responses are retried with the same idempotency key
+    stripe_max_network_retries: int = 2
+    # Per-process cache of Stripe object retrievals
+    stripe_read_cache_size: int = 10_000
+    stripe_read_cache_ttl: float = 10
+
+    # Per-customer limits on Stripe-hitting endpoints (enforced only with Redis)
+    max_concurrent_per_customer: int = 10
+    customer_concurrency_window: int = 60
+
+    # Cache Configuration (caching is disabled when empty)
+    redis_url: str = ""
+
+    # Where payments and refunds are stored ("redis" requires REDIS_URL)
+    storage_backend: Literal["memory", "redis"] = "memory"
+
     # Application Configuration
-    app_name: str = os.getenv("APP_NAME", "Stripe B2B Payments API")
-    debug: bool = os.getenv("DEBUG", "True").lower() == "true"
-    host: str = os.getenv("HOST", "0.0.0.0")
-    port: int = int(os.getenv("PORT", "8000"))
-    
+    app_name: str = "Stripe B2B Payments API"
+    debug: bool = True
+    host: str = "0.0.0.0"
+    port: int = 8000
+
+    # CORS Configuration (JSON list in the environment)
+    cors_origins: list[str] = ["http://localhost:8000"]
+    cors_max_age: int = 600
+
     # OAuth Configuration
-    oauth_redirect_uri: str = os.getenv("OAUTH_REDIRECT_URI", "http://localhost:8000/connect/oauth/callback")
-    
+    oauth_redirect_uri: str = "http://localhost:8000/connect/oauth/callback"
+
     @property
     def is_development(self) -> bool:
         """Check if running in development mode."""
         return self.debug
-    
-    def validate_stripe_config(self) -> bool:
-        """Validate that required Stripe configuration is present."""
+
+    @cached_property
+    def stripe_configured(self) -> bool:
+        """Whether all required Stripe configuration is present."""
         return all([
             self.stripe_publishable_key,
-            self.stripe_secret_key,
-            self.stripe_webhook_secret
+            self.stripe_secret_key.get_secret_value(),
+            self.stripe_webhook_secret.get_secret_value()
         ])
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get application settings (parsed once per process).
+
+    Returns:
+        Settings: Validated application settings
+    """
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -9,6 +9,7 @@ from typing import Final
 API_V1_PREFIX: Final[str] = "/api/v1"
 DEFAULT_PAGE_SIZE: Final[int] = 10
 MAX_PAGE_SIZE: Final[int] = 100
+MAX_BATCH_SIZE: Final[int] = 100
 
 # Stripe Constants
 STRIPE_CURRENCY_EUR: Final[str] = "eur"
@@ -16,6 +17,31 @@ STRIPE_CURRENCY_USD: Final[str] = "usd"
 STRIPE_TEST_PAYMENT_METHOD: Final[str] = "pm_card_visa"
 STRIPE_RETURN_URL: Final[str] = "https://example.com/return"
 
+# Cache Constants
+STRIPE_READ_PAYMENT_INTENT: Final[str] = "payment_intent"
+STRIPE_READ_CUSTOMER: Final[str] = "customer"
+STRIPE_READ_ACCOUNT: Final[str] = "account"
+STRIPE_READ_SUBSCRIPTION: Final[str] = "subscription"
+STRIPE_READ_REFUND: Final[str] = "refund"
+ACCOUNT_CACHE_KEY: Final[str] = "acct:{account_id}"
+ACCOUNT_CACHE_TTL: Final[int] = 60
+PAYMENT_STATUS_CACHE_KEY: Final[str] = "pi_status:{payment_intent_id}"
+PAYMENT_STATUS_CACHE_TTL: Final[int] = 5
+
+# Rate Limiting Constants
+CUSTOMER_CONCURRENCY_KEY: Final[str] = "concurrency:{customer_id}"
+
+# Storage Constants (Redis repository keys)
+STORAGE_BACKEND_MEMORY: Final[str] = "memory"
+STORAGE_BACKEND_REDIS: Final[str] = "redis"
+PAYMENT_KEY: Final[str] = "payment:{payment_id}"
+PAYMENTS_BY_CREATED_KEY: Final[str] = "payments:by_created"
+PAYMENTS_BY_CUSTOMER_KEY: Final[str] = "payments:by_customer:{customer_id}"
+PAYMENTS_BY_INTENT_KEY: Final[str] = "payments:by_intent"
+REFUND_KEY: Final[str] = "refund:{refund_id}"
+REFUNDS_BY_CREATED_KEY: Final[str] = "refunds:by_created"
+REFUNDS_BY_PAYMENT_INTENT_KEY: Final[str] = "refunds:by_payment_intent:{payment_intent_id}"
+
 # Payment Statuses
 class PaymentStatus(str, Enum):
     """Payment status enumeration."""
@@ -52,6 +78,7 @@ class ErrorMessages:
     PAYMENT_NOT_FOUND = "Payment not found"
     SUBSCRIPTION_NOT_FOUND = "Subscription not found"
     CUSTOMER_NOT_FOUND = "Customer not found"
+    REFUND_NOT_FOUND = "Refund not found"
     PAYMENT_INTENT_NOT_FOUND = "Payment intent not found"
     INVALID_PAYMENT_INTENT = "Payment has no Stripe Payment Intent ID"
     FAILED_TO_CREATE_PAYMENT = "Failed to create payment"
@@ -60,13 +87,19 @@ class ErrorMessages:
     FAILED_TO_GET_PAYMENT_STATUS = "Failed to get payment status"
     FAILED_TO_LIST_PAYMENTS = "Failed to list payments"
     FAILED_TO_LIST_SUBSCRIPTIONS = "Failed to list subscriptions"
+    PAYMENT_PROVIDER_ERROR = "Payment provider request failed"
+    PAYMENT_PROVIDER_RATE_LIMITED = "Payment provider rate limit exceeded, retry later"
+    TOO_MANY_CONCURRENT_REQUESTS = "Too many concurrent requests for this customer, retry later"
+    INVALID_WEBHOOK = "Invalid webhook payload or signature"
 
 # Success Messages
 class SuccessMessages:
     """Success message constants."""
     PAYMENT_CREATED = "Payment created successfully"
+    PAYMENTS_BATCH_PROCESSED = "Payment batch processed"
     REFUND_CREATED = "Refund created successfully"
     SUBSCRIPTION_CREATED = "Subscription created successfully"
+    SUBSCRIPTION_CANCELED = "Subscription cancelled successfully"
     WEBHOOK_PROCESSED = "Webhook processed successfully"
 
 # Frontend Constants
@@ -75,5 +108,5 @@ class FrontendConstants:
     DEFAULT_CUSTOMER_ID = "cus_Sv4FKwNttBnriu"
     DEFAULT_PRICE_ID = "price_1RzE8UGdcuwpbMT4F9Ggqg0R"
     DEFAULT_TRIAL_DAYS = 7
-    DEFAULT_REFUND_AMOUNT = 10.00
-    DEFAULT_PAYMENT_AMOUNT = 20.00
+    DEFAULT_REFUND_AMOUNT = 1000  # cents
+    DEFAULT_PAYMENT_AMOUNT = 2000  # cents
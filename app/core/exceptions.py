@@ -0,0 +1,67 @@
+"""
+Pre-configured HTTP exceptions for common API errors.
+"""
+from fastapi import HTTPException, status
+
+from app.constants import ErrorMessages
+
+
+class PaymentNotFoundError(HTTPException):
+    """Raised when a payment does not exist."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorMessages.PAYMENT_NOT_FOUND
+        )
+
+
+class InvalidPaymentIntentError(HTTPException):
+    """Raised when a payment has no Stripe payment intent."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorMessages.INVALID_PAYMENT_INTENT
+        )
+
+
+class RefundNotFoundError(HTTPException):
+    """Raised when a refund does not exist."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorMessages.REFUND_NOT_FOUND
+        )
+
+
+class SubscriptionNotFoundError(HTTPException):
+    """Raised when a subscription does not exist."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorMessages.SUBSCRIPTION_NOT_FOUND
+        )
+
+
+class InvalidWebhookError(HTTPException):
+    """Raised when a webhook payload is malformed or its signature does not verify."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorMessages.INVALID_WEBHOOK
+        )
+
+
+class TooManyConcurrentRequestsError(HTTPException):
+    """Raised when a customer exceeds its concurrent request limit."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ErrorMessages.TOO_MANY_CONCURRENT_REQUESTS,
+            headers={"Retry-After": "1"}
+        )
@@ -0,0 +1,38 @@
+"""
+Route and request classes that parse JSON request bodies with orjson.
+"""
+from typing import Any, Callable, Coroutine
+
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is decoded with orjson instead of the stdlib json module."""
+
+    async def json(self) -> Any:
+        """
+        Decode and cache the JSON body.
+
+        orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+        still turns malformed bodies into a 422 response.
+
+        Returns:
+            Decoded JSON body
+        """
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """API route that hands its endpoint an ORJSONRequest."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request) -> Response:
+            return await route_handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
@@ -1,69 +1,205 @@
 """
 Dependency injection container for application services.
+
+Services are constructed once at import time as module-level instances;
+providers simply hand those instances to FastAPI.
 """
-from typing import Annotated
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Annotated, Any, AsyncIterator, Optional
 
-from fastapi import Depends
+from fastapi import Depends, Header, Request
 
-from app.services.payment_service import PaymentService
-from app.services.refund_service import RefundService
-from app.services.subscription_service import SubscriptionService
-from app.services.stripe_service import StripeService
+from app.services.cache_service import CacheService, cache_service
+from app.services.concurrency_limiter import ConcurrencyLimiter, concurrency_limiter
+from app.services.payment_service import PaymentService, payment_service
+from app.services.refund_service import RefundService, refund_service
+from app.services.subscription_service import SubscriptionService, subscription_service
+from app.services.stripe_service import StripeService, stripe_service
 
 
 def get_stripe_service() -> StripeService:
     """
-    Get Stripe service instance (singleton).
+    Get Stripe service instance.
     
     Returns:
         StripeService: Stripe service instance
     """
-    return StripeService()
+    return stripe_service
 
 
-def get_payment_service(
-    stripe_service: Annotated[StripeService, Depends(get_stripe_service)]
-) -> PaymentService:
+def get_cache_service() -> CacheService:
     """
-    Get payment service instance with injected dependencies (singleton).
+    Get cache service instance.
+    
+    Returns:
+        CacheService: Cache service instance
+    """
+    return cache_service
+
+
+def get_concurrency_limiter() -> ConcurrencyLimiter:
+    """
+    Get per-customer concurrency limiter instance.
+    
+    Returns:
+        ConcurrencyLimiter: Concurrency limiter instance
+    """
+    return concurrency_limiter
+
+
+def get_payment_service() -> PaymentService:
+    """
+    Get payment service instance.
     
-    Args:
-        stripe_service: Stripe service instance
-        
     Returns:
         PaymentService: Payment service instance
     """
-    return PaymentService(stripe_service=stripe_service)
+    return payment_service
 
 
-def get_refund_service(
-    stripe_service: Annotated[StripeService, Depends(get_stripe_service)]
-) -> RefundService:
+def get_refund_service() -> RefundService:
     """
-    Get refund service instance with injected dependencies (singleton).
+    Get refund service instance.
+    
+    Returns:
+        RefundService: Refund service instance
+    """
+    return refund_service
+
+
+def get_subscription_service() -> SubscriptionService:
+    """
+    Get subscription service instance.
+    
+    Returns:
+        SubscriptionService: Subscription service instance
+    """
+    return subscription_service
+
+
+@dataclass(frozen=True)
+class Services:
+    """Container for all application services, injected as a single dependency."""
+    stripe: StripeService
+    cache: CacheService
+    limiter: ConcurrencyLimiter
+    payment: PaymentService
+    refund: RefundService
+    subscription: SubscriptionService
+
+
+_services = Services(
+    stripe=stripe_service,
+    cache=cache_service,
+    limiter=concurrency_limiter,
+    payment=payment_service,
+    refund=refund_service,
+    subscription=subscription_service
+)
+
+
+def get_services() -> Services:
+    """
+    Get the application services container.
+    
+    Routes depend on this instead of on individual providers, so FastAPI
+    resolves one dependency per request rather than a graph of them.
+    
+    Returns:
+        Services: Services container
+    """
+    return _services
+
+
+ServicesDep = Annotated[Services, Depends(get_services)]
+
+IdempotencyKeyHeader = Annotated[
+    Optional[str],
+    Header(
+        alias="Idempotency-Key",
+        description="Client key forwarded to Stripe so a retried create isn't applied twice"
+    )
+]
+
+
+async def _read_json(request: Request) -> Any:
+    """
+    Read the request's JSON body without failing on bodies that aren't JSON.
+    
+    A valid JSON body has already been parsed by FastAPI, so this does not parse it
+    again; an empty or non-JSON body yields None and is rejected by the route's validation.
     
     Args:
-        stripe_service: Stripe service instance
+        request: FastAPI request object
         
     Returns:
-        RefundService: Refund service instance
+        Decoded body, or None if it isn't valid JSON
     """
-    return RefundService(stripe_service=stripe_service)
+    try:
+        return await request.json()
+    except ValueError:
+        return None
 
 
-def get_subscription_service(
-    stripe_service: Annotated[StripeService, Depends(get_stripe_service)]
-) -> SubscriptionService:
+def _client_key(request: Request) -> str:
     """
-    Get subscription service instance with injected dependencies (singleton).
+    Get the tenant key for requests that don't carry a customer_id.
     
     Args:
-        stripe_service: Stripe service instance
+        request: FastAPI request object
         
     Returns:
-        SubscriptionService: Subscription service instance
+        Client address, or "anonymous" if it is unknown
+    """
+    return request.client.host if request.client else "anonymous"
+
+
+async def limit_customer_concurrency(
+    request: Request,
+    services: ServicesDep
+) -> AsyncIterator[None]:
+    """
+    Hold a per-customer concurrency slot for the duration of the request.
+    
+    The tenant is the body's customer_id, falling back to the client address for
+    requests that don't carry one.
+    
+    Args:
+        request: FastAPI request object
+        services: Application services
     """
-    return SubscriptionService(stripe_service=stripe_service)
+    body = await _read_json(request)
+    customer_id = body.get("customer_id") if isinstance(body, dict) else None
+
+    async with services.limiter.slot(customer_id or _client_key(request)):
+        yield
 
 
+async def limit_batch_concurrency(
+    request: Request,
+    services: ServicesDep
+) -> AsyncIterator[None]:
+    """
+    Hold a concurrency slot for each distinct customer in a batch body.
+    
+    Items without a customer_id count against the client address, as single creates
+    do. If any customer is at its limit the whole batch is rejected and the slots
+    already taken are released.
+    
+    Args:
+        request: FastAPI request object
+        services: Application services
+    """
+    body = await _read_json(request)
+    items = body if isinstance(body, list) else []
+    fallback = _client_key(request)
+    customer_ids = {
+        (item.get("customer_id") if isinstance(item, dict) else None) or fallback
+        for item in items
+    } or {fallback}
 
+    async with AsyncExitStack() as stack:
+        for customer_id in sorted(customer_ids):
+            await stack.enter_async_context(services.limiter.slot(customer_id))
+        yield
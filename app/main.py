@@ -1,34 +1,151 @@
 """
 Main FastAPI application for Stripe B2B Payments API.
 """
-from fastapi import FastAPI, Request, HTTPException, status
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Tuple
+
+import orjson
+import stripe
+from fastapi import FastAPI, Request, Response, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 
 from app.api import auth, payments, refunds, subscriptions
 from app.config import settings
-from app.constants import API_V1_PREFIX
+from app.constants import API_V1_PREFIX, ErrorMessages
+from app.dependencies import get_services
+
+logger = logging.getLogger(__name__)
+
+STATIC_CACHE_CONTROL = "public, max-age=30"
+DASHBOARD_CACHE_CONTROL = "public, max-age=60"
+
+# Bodies of the static info endpoints never change for the life of the process
+API_INFO_BODY = orjson.dumps({
+    "message": "Welcome to Stripe B2B Payments API",
+    "version": "0.1.0",
+    "docs": "/docs",
+    "redoc": "/redoc"
+})
+HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "stripe_configured": settings.stripe_configured
+})
+
+
+def _etag(body: bytes) -> str:
+    """
+    Build a strong ETag for a response body.
+    
+    Args:
+        body: Response body
+        
+    Returns:
+        Quoted ETag value
+    """
+    return f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+
+API_INFO_ETAG = _etag(API_INFO_BODY)
+HEALTH_ETAG = _etag(HEALTH_BODY)
+
+# Error bodies up to the "path" value; handlers only encode the path itself
+NOT_FOUND_BODY_PREFIX = orjson.dumps({
+    "error": "Not Found",
+    "message": "The requested resource was not found",
+    "path": None
+})[:-len(b"null}")]
+INTERNAL_ERROR_BODY_PREFIX = orjson.dumps({
+    "error": "Internal Server Error",
+    "message": "An unexpected error occurred",
+    "path": None
+})[:-len(b"null}")]
+
+
+def _static_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    media_type: str = "application/json",
+    cache_control: str = STATIC_CACHE_CONTROL
+) -> Response:
+    """
+    Serve a pre-rendered body, answering conditional requests with 304.
+    
+    Args:
+        request: FastAPI request object
+        body: Pre-rendered body
+        etag: ETag of the body
+        media_type: Content type of the body
+        cache_control: Cache-Control header value
+        
+    Returns:
+        200 response with the body, or 304 if the client's copy is current
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
 
 # Templates
 templates = Jinja2Templates(directory="templates")
 
+
+@lru_cache(maxsize=1)
+def _dashboard() -> Tuple[bytes, str]:
+    """
+    Render the dashboard once; it uses no per-request template variables.
+    
+    Returns:
+        Rendered HTML body and its ETag
+    """
+    body = templates.get_template("dashboard.html").render().encode()
+    return body, _etag(body)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: release pooled outbound connections on shutdown.
+    
+    Args:
+        app: FastAPI application
+    """
+    yield
+    services = get_services()
+    await services.stripe.close()
+    await services.cache.close()
+    await services.limiter.close()
+    await services.payment.close()
+    await services.refund.close()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.app_name,
     description="Advanced Payments API for B2B payments using Stripe Connect",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify actual origins
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "Idempotency-Key", "Stripe-Signature"],
+    # Let browsers reuse preflight results instead of re-sending OPTIONS per request
+    max_age=settings.cors_max_age,
 )
 
 # Include API routes
@@ -39,14 +156,23 @@ app.include_router(subscriptions.router, prefix=API_V1_PREFIX)
 
 
 @app.get("/", response_class=HTMLResponse)
-async def root(request: Request):
+async def root(request: Request) -> Response:
     """
     Root endpoint - serves the frontend.
     
+    The page is rendered on the first request and then served from memory
+    with an ETag.
+    
+    Args:
+        request: FastAPI request object
+        
     Returns:
         HTML frontend page
     """
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    body, etag = _dashboard()
+    return _static_response(
+        request, body, etag, media_type="text/html", cache_control=DASHBOARD_CACHE_CONTROL
+    )
 
 
 @app.get(
@@ -54,25 +180,25 @@ async def root(request: Request):
     status_code=status.HTTP_200_OK,
     name="API Info",
     responses={
-        200: {"description": "API information retrieved successfully"}
+        200: {"description": "API information retrieved successfully"},
+        304: {"description": "API information unchanged since the given ETag"}
     }
 )
-async def api_info() -> dict:
+async def api_info(request: Request) -> Response:
     """
     API info endpoint.
     
     This endpoint provides basic information about the API including
-    version, documentation links, and available endpoints.
+    version, documentation links, and available endpoints. The body is
+    pre-rendered at startup and served with an ETag.
     
+    Args:
+        request: FastAPI request object
+        
     Returns:
-        dict: API information including version and documentation links
+        Response: API information including version and documentation links
     """
-    return {
-        "message": "Welcome to Stripe B2B Payments API",
-        "version": "0.1.0",
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
+    return _static_response(request, API_INFO_BODY, API_INFO_ETAG)
 
 
 @app.get(
@@ -80,23 +206,25 @@ async def api_info() -> dict:
     status_code=status.HTTP_200_OK,
     name="Health Check",
     responses={
-        200: {"description": "Health status retrieved successfully"}
+        200: {"description": "Health status retrieved successfully"},
+        304: {"description": "Health status unchanged since the given ETag"}
     }
 )
-async def health_check() -> dict:
+async def health_check(request: Request) -> Response:
     """
     Health check endpoint.
     
     This endpoint provides the current health status of the application
-    including Stripe configuration validation.
+    including Stripe configuration validation. Settings are frozen, so the
+    body is pre-rendered at startup and served with an ETag.
     
+    Args:
+        request: FastAPI request object
+        
     Returns:
-        dict: Health status including Stripe configuration status
+        Response: Health status including Stripe configuration status
     """
-    return {
-        "status": "healthy",
-        "stripe_configured": settings.validate_stripe_config()
-    }
+    return _static_response(request, HEALTH_BODY, HEALTH_ETAG)
 
 
 @app.exception_handler(404)
@@ -111,13 +239,10 @@ async def not_found_handler(request: Request, exc):
     Returns:
         Custom 404 response
     """
-    return JSONResponse(
+    return Response(
+        content=NOT_FOUND_BODY_PREFIX + orjson.dumps(request.url.path) + b"}",
         status_code=404,
-        content={
-            "error": "Not Found",
-            "message": "The requested resource was not found",
-            "path": request.url.path
-        }
+        media_type="application/json"
     )
 
 
@@ -133,13 +258,52 @@ async def internal_error_handler(request: Request, exc):
     Returns:
         Custom 500 response
     """
-    return JSONResponse(
+    return Response(
+        content=INTERNAL_ERROR_BODY_PREFIX + orjson.dumps(request.url.path) + b"}",
         status_code=500,
-        content={
-            "error": "Internal Server Error",
-            "message": "An unexpected error occurred",
-            "path": request.url.path
-        }
+        media_type="application/json"
+    )
+
+
+@app.exception_handler(stripe.StripeError)
+async def stripe_error_handler(request: Request, exc: stripe.StripeError):
+    """
+    Translate Stripe errors raised by route handlers into HTTP responses.
+    
+    Rate limits become 429 with a Retry-After hint, card declines 402, invalid
+    requests 400/404, and anything else (auth, network, API) a 502.
+    
+    Args:
+        request: FastAPI request object
+        exc: Stripe error raised while handling the request
+        
+    Returns:
+        Error response in the same shape as HTTPException responses
+    """
+    headers = None
+
+    if isinstance(exc, stripe.RateLimitError):
+        status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        detail = ErrorMessages.PAYMENT_PROVIDER_RATE_LIMITED
+        headers = {"Retry-After": (exc.headers or {}).get("retry-after", "1")}
+    elif isinstance(exc, stripe.CardError):
+        status_code = status.HTTP_402_PAYMENT_REQUIRED
+        detail = exc.user_message
+    elif isinstance(exc, stripe.InvalidRequestError):
+        status_code = (
+            status.HTTP_404_NOT_FOUND if exc.http_status == 404
+            else status.HTTP_400_BAD_REQUEST
+        )
+        detail = exc.user_message
+    else:
+        logger.error("Stripe request failed on %s", request.url.path, exc_info=exc)
+        status_code = status.HTTP_502_BAD_GATEWAY
+        detail = ErrorMessages.PAYMENT_PROVIDER_ERROR
+
+    return ORJSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers=headers
     )
 
 
@@ -150,5 +314,10 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.is_development
+        reload=settings.is_development,
+        # uvloop where installed (not on Windows), asyncio otherwise
+        loop="auto",
+        http="httptools",
+        # One process: subscriptions (and by default payments and refunds) live in memory
+        access_log=False
     )
@@ -0,0 +1,14 @@
+"""
+Base class for response models.
+"""
+from pydantic import BaseModel, ConfigDict
+
+
+class ResponseModel(BaseModel):
+    """
+    Immutable API response model.
+    
+    Payments and subscriptions are stored as frozen dataclass records (updated with
+    dataclasses.replace) and only turned into response models by their to_response().
+    """
+    model_config = ConfigDict(extra="ignore", frozen=True)
@@ -1,28 +1,29 @@
 """
 Pydantic models for payment-related data structures.
 """
+from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
 from app.constants import PaymentStatus, STRIPE_CURRENCY_USD
+from app.models.base import ResponseModel
 
 
 class PaymentCreateRequest(BaseModel):
     """Request model for creating a payment."""
-    amount: Decimal = Field(..., gt=0, description="Payment amount in cents")
+    amount: int = Field(..., gt=0, description="Payment amount in cents")
     currency: str = Field(default=STRIPE_CURRENCY_USD, description="Payment currency")
     description: Optional[str] = Field(None, description="Payment description")
     customer_id: Optional[str] = Field(None, description="Stripe customer ID")
     metadata: Optional[dict] = Field(None, description="Additional metadata")
 
 
-class PaymentResponse(BaseModel):
+class PaymentResponse(ResponseModel):
     """Response model for payment data."""
     id: str = Field(..., description="Payment ID")
-    amount: Decimal = Field(..., description="Payment amount")
+    amount: int = Field(..., description="Payment amount in cents")
     currency: str = Field(..., description="Payment currency")
     status: PaymentStatus = Field(..., description="Payment status")
     description: Optional[str] = Field(None, description="Payment description")
@@ -33,9 +34,47 @@ class PaymentResponse(BaseModel):
     metadata: Optional[dict] = Field(None, description="Payment metadata")
 
 
-class PaymentListResponse(BaseModel):
+@dataclass(slots=True, frozen=True)
+class PaymentRecord:
+    """Stored payment; only turned into a PaymentResponse at the API boundary."""
+    id: str
+    amount: int
+    currency: str
+    status: PaymentStatus
+    description: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    stripe_payment_intent_id: Optional[str]
+    customer_id: Optional[str]
+    metadata: Optional[dict]
+
+    def to_response(self) -> PaymentResponse:
+        """
+        Build the response model without re-validating the record.
+
+        Returns:
+            Payment response
+        """
+        return PaymentResponse.model_construct(
+            id=self.id,
+            amount=self.amount,
+            currency=self.currency,
+            status=self.status,
+            description=self.description,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            stripe_payment_intent_id=self.stripe_payment_intent_id,
+            customer_id=self.customer_id,
+            metadata=self.metadata
+        )
+
+
+class PaymentListResponse(ResponseModel):
     """Response model for payment list."""
     payments: list[PaymentResponse] = Field(..., description="List of payments")
     total: int = Field(..., description="Total number of payments")
     page: int = Field(..., description="Current page number")
     per_page: int = Field(..., description="Payments per page")
+    statuses: Optional[dict[str, str]] = Field(
+        None, description="Live Stripe status by payment ID (only when requested; failed lookups are omitted)"
+    )
@@ -1,6 +1,7 @@
 """
 Pydantic models for subscription-related data structures.
 """
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
@@ -8,6 +9,7 @@ from typing import Optional
 from pydantic import BaseModel, Field
 
 from app.constants import SubscriptionStatus
+from app.models.base import ResponseModel
 
 
 class SubscriptionCreateRequest(BaseModel):
@@ -19,7 +21,7 @@ class SubscriptionCreateRequest(BaseModel):
     metadata: Optional[dict] = Field(None, description="Additional metadata")
 
 
-class SubscriptionResponse(BaseModel):
+class SubscriptionResponse(ResponseModel):
     """Response model for subscription data."""
     id: str = Field(..., description="Subscription ID")
     customer_id: str = Field(..., description="Customer ID")
@@ -36,9 +38,53 @@ class SubscriptionResponse(BaseModel):
     updated_at: datetime = Field(..., description="Subscription last update timestamp")
 
 
-class SubscriptionListResponse(BaseModel):
+@dataclass(slots=True, frozen=True)
+class SubscriptionRecord:
+    """Stored subscription; only turned into a SubscriptionResponse at the API boundary."""
+    id: str
+    customer_id: str
+    status: SubscriptionStatus
+    current_period_start: datetime
+    current_period_end: datetime
+    trial_start: Optional[datetime]
+    trial_end: Optional[datetime]
+    cancel_at_period_end: bool
+    canceled_at: Optional[datetime]
+    stripe_subscription_id: Optional[str]
+    metadata: Optional[dict]
+    created_at: datetime
+    updated_at: datetime
+
+    def to_response(self) -> SubscriptionResponse:
+        """
+        Build the response model without re-validating the record.
+
+        Returns:
+            Subscription response
+        """
+        return SubscriptionResponse.model_construct(
+            id=self.id,
+            customer_id=self.customer_id,
+            status=self.status,
+            current_period_start=self.current_period_start,
+            current_period_end=self.current_period_end,
+            trial_start=self.trial_start,
+            trial_end=self.trial_end,
+            cancel_at_period_end=self.cancel_at_period_end,
+            canceled_at=self.canceled_at,
+            stripe_subscription_id=self.stripe_subscription_id,
+            metadata=self.metadata,
+            created_at=self.created_at,
+            updated_at=self.updated_at
+        )
+
+
+class SubscriptionListResponse(ResponseModel):
     """Response model for subscription list."""
     subscriptions: list[SubscriptionResponse] = Field(..., description="List of subscriptions")
     total: int = Field(..., description="Total number of subscriptions")
     page: int = Field(..., description="Current page number")
     per_page: int = Field(..., description="Subscriptions per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `after` to fetch the next page (None on the last page)"
+    )
@@ -5,7 +5,9 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import Field
+
+from app.models.base import ResponseModel
 
 
 class UserRole(str, Enum):
@@ -15,7 +17,7 @@ class UserRole(str, Enum):
     ADMIN = "admin"
 
 
-class UserResponse(BaseModel):
+class UserResponse(ResponseModel):
     """Response model for user data."""
     id: str = Field(..., description="User ID")
     email: str = Field(..., description="User email")
@@ -28,7 +30,7 @@ class UserResponse(BaseModel):
     updated_at: datetime = Field(..., description="User last update timestamp")
 
 
-class ConnectAccountResponse(BaseModel):
+class ConnectAccountResponse(ResponseModel):
     """Response model for Stripe Connect account data."""
     account_id: str = Field(..., description="Stripe Connect account ID")
     business_type: Optional[str] = Field(None, description="Business type")
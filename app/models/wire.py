@@ -0,0 +1,80 @@
+"""
+msgspec mirrors of the list response models, used to serialize list endpoints.
+
+The pydantic models stay the documented response schema; these structs only
+produce the same JSON faster. Payment and subscription records are dataclasses,
+which msgspec encodes directly.
+"""
+from typing import Any, Optional
+
+import msgspec
+
+from app.constants import RefundReason
+from app.models.payment import PaymentRecord
+from app.models.subscription import SubscriptionRecord
+
+
+class PaymentListOut(msgspec.Struct):
+    """Wire form of PaymentListResponse."""
+    payments: list[PaymentRecord]
+    total: int
+    page: int
+    per_page: int
+    statuses: Optional[dict[str, str]]
+
+
+class RefundOut(msgspec.Struct):
+    """Wire form of RefundResponse."""
+    id: str
+    payment_intent_id: str
+    amount: int
+    currency: str
+    status: str
+    reason: Optional[RefundReason]
+    created_at: int
+
+
+class RefundListOut(msgspec.Struct):
+    """Wire form of RefundListResponse."""
+    refunds: list[RefundOut]
+    total: int
+    has_more: bool
+
+
+class SubscriptionListOut(msgspec.Struct):
+    """Wire form of SubscriptionListResponse."""
+    subscriptions: list[SubscriptionRecord]
+    total: int
+    page: int
+    per_page: int
+    next_cursor: Optional[str]
+
+
+_encoder = msgspec.json.Encoder()
+
+
+def to_wire(records: list, struct_type: type) -> list:
+    """
+    Copy response model records into wire structs.
+
+    Args:
+        records: Response model instances
+        struct_type: Matching wire struct type
+
+    Returns:
+        List of wire structs
+    """
+    return msgspec.convert(records, list[struct_type], from_attributes=True)
+
+
+def encode(obj: Any) -> bytes:
+    """
+    Encode a wire struct or stored record as JSON.
+
+    Args:
+        obj: Wire struct or dataclass record
+
+    Returns:
+        JSON bytes
+    """
+    return _encoder.encode(obj)
@@ -0,0 +1 @@
+# Async storage backends for service state
@@ -0,0 +1,237 @@
+"""
+Payment storage backends: in-memory for a single process, Redis for multi-worker deployments.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import msgspec
+from redis.asyncio import Redis
+from sortedcontainers import SortedKeyList
+
+from app.config import settings
+from app.constants import (
+    STORAGE_BACKEND_REDIS,
+    PAYMENT_KEY,
+    PAYMENTS_BY_CREATED_KEY,
+    PAYMENTS_BY_CUSTOMER_KEY,
+    PAYMENTS_BY_INTENT_KEY
+)
+from app.models.payment import PaymentRecord
+
+
+class PaymentRepository(ABC):
+    """Async storage interface for payment records."""
+
+    @abstractmethod
+    async def add(self, payment: PaymentRecord) -> None:
+        """
+        Store a new payment and index it.
+
+        Args:
+            payment: Payment to store
+        """
+
+    @abstractmethod
+    async def save(self, payment: PaymentRecord) -> None:
+        """
+        Replace an already stored payment (indexed fields must not change).
+
+        Args:
+            payment: Updated payment
+        """
+
+    @abstractmethod
+    async def get(self, payment_id: str) -> Optional[PaymentRecord]:
+        """
+        Get a payment by ID.
+
+        Args:
+            payment_id: Payment ID
+
+        Returns:
+            Payment or None
+        """
+
+    @abstractmethod
+    async def get_by_intent(self, payment_intent_id: str) -> Optional[PaymentRecord]:
+        """
+        Get a payment by its Stripe payment intent ID.
+
+        Args:
+            payment_intent_id: Stripe payment intent ID
+
+        Returns:
+            Payment or None
+        """
+
+    @abstractmethod
+    async def list_page(
+        self,
+        customer_id: Optional[str],
+        offset: int,
+        limit: int
+    ) -> List[PaymentRecord]:
+        """
+        Get a slice of payments, newest first.
+
+        Args:
+            customer_id: Filter by customer ID
+            offset: Number of payments to skip
+            limit: Maximum number of payments to return
+
+        Returns:
+            List of payments
+        """
+
+    @abstractmethod
+    async def count(self, customer_id: Optional[str] = None) -> int:
+        """
+        Count payments.
+
+        Args:
+            customer_id: Filter by customer ID
+
+        Returns:
+            Number of payments
+        """
+
+    async def close(self) -> None:
+        """Release any connections held by the backend."""
+
+
+class InMemoryPaymentRepository(PaymentRepository):
+    """Per-process payment store; state is not shared between workers."""
+
+    def __init__(self):
+        """Initialize empty store and indexes."""
+        self._payments: Dict[str, PaymentRecord] = {}
+        # Payment IDs ordered by creation time, oldest first (ties keep insertion order)
+        self._by_created: SortedKeyList = SortedKeyList(
+            key=lambda payment_id: self._payments[payment_id].created_at
+        )
+        # Payment IDs per customer, oldest first
+        self._by_customer: Dict[str, List[str]] = {}
+        # Payment ID by Stripe payment intent ID, for webhook lookups
+        self._by_intent: Dict[str, str] = {}
+
+    async def add(self, payment: PaymentRecord) -> None:
+        self._payments[payment.id] = payment
+        self._by_created.add(payment.id)
+        if payment.stripe_payment_intent_id:
+            self._by_intent[payment.stripe_payment_intent_id] = payment.id
+        if payment.customer_id:
+            self._by_customer.setdefault(payment.customer_id, []).append(payment.id)
+
+    async def save(self, payment: PaymentRecord) -> None:
+        self._payments[payment.id] = payment
+
+    async def get(self, payment_id: str) -> Optional[PaymentRecord]:
+        return self._payments.get(payment_id)
+
+    async def get_by_intent(self, payment_intent_id: str) -> Optional[PaymentRecord]:
+        payment_id = self._by_intent.get(payment_intent_id)
+        return self._payments[payment_id] if payment_id else None
+
+    async def list_page(
+        self,
+        customer_id: Optional[str],
+        offset: int,
+        limit: int
+    ) -> List[PaymentRecord]:
+        # Both indexes are oldest first, so the newest-first page is a reversed tail slice
+        ids = self._by_customer.get(customer_id, []) if customer_id else self._by_created
+        stop = max(len(ids) - offset, 0)
+        page_ids = ids[max(stop - limit, 0):stop]
+        return [self._payments[payment_id] for payment_id in reversed(page_ids)]
+
+    async def count(self, customer_id: Optional[str] = None) -> int:
+        if customer_id:
+            return len(self._by_customer.get(customer_id, []))
+
+        return len(self._payments)
+
+
+class RedisPaymentRepository(PaymentRepository):
+    """
+    Payment store shared by all workers.
+
+    Each payment is a JSON string under payment:{id}; sorted sets scored by
+    creation time back pagination, and a hash maps intent IDs to payment IDs.
+    """
+
+    def __init__(self, redis: Redis):
+        """
+        Initialize repository.
+
+        Args:
+            redis: Async Redis client
+        """
+        self._redis = redis
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        await self._redis.aclose()
+
+    async def add(self, payment: PaymentRecord) -> None:
+        score = payment.created_at.timestamp()
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(PAYMENT_KEY.format(payment_id=payment.id), msgspec.json.encode(payment))
+            pipe.zadd(PAYMENTS_BY_CREATED_KEY, {payment.id: score})
+            if payment.stripe_payment_intent_id:
+                pipe.hset(PAYMENTS_BY_INTENT_KEY, payment.stripe_payment_intent_id, payment.id)
+            if payment.customer_id:
+                pipe.zadd(
+                    PAYMENTS_BY_CUSTOMER_KEY.format(customer_id=payment.customer_id),
+                    {payment.id: score}
+                )
+            await pipe.execute()
+
+    async def save(self, payment: PaymentRecord) -> None:
+        await self._redis.set(PAYMENT_KEY.format(payment_id=payment.id), msgspec.json.encode(payment))
+
+    async def get(self, payment_id: str) -> Optional[PaymentRecord]:
+        raw = await self._redis.get(PAYMENT_KEY.format(payment_id=payment_id))
+        return msgspec.json.decode(raw, type=PaymentRecord) if raw is not None else None
+
+    async def get_by_intent(self, payment_intent_id: str) -> Optional[PaymentRecord]:
+        payment_id = await self._redis.hget(PAYMENTS_BY_INTENT_KEY, payment_intent_id)
+        return await self.get(payment_id.decode()) if payment_id else None
+
+    async def list_page(
+        self,
+        customer_id: Optional[str],
+        offset: int,
+        limit: int
+    ) -> List[PaymentRecord]:
+        index_key = (
+            PAYMENTS_BY_CUSTOMER_KEY.format(customer_id=customer_id)
+            if customer_id else PAYMENTS_BY_CREATED_KEY
+        )
+        page_ids = await self._redis.zrevrange(index_key, offset, offset + limit - 1)
+        if not page_ids:
+            return []
+
+        raws = await self._redis.mget([
+            PAYMENT_KEY.format(payment_id=payment_id.decode()) for payment_id in page_ids
+        ])
+        return [msgspec.json.decode(raw, type=PaymentRecord) for raw in raws if raw is not None]
+
+    async def count(self, customer_id: Optional[str] = None) -> int:
+        index_key = (
+            PAYMENTS_BY_CUSTOMER_KEY.format(customer_id=customer_id)
+            if customer_id else PAYMENTS_BY_CREATED_KEY
+        )
+        return await self._redis.zcard(index_key)
+
+
+def create_payment_repository() -> PaymentRepository:
+    """
+    Build the payment repository selected by STORAGE_BACKEND.
+
+    Returns:
+        Redis-backed repository, or an in-memory one by default
+    """
+    if settings.storage_backend == STORAGE_BACKEND_REDIS:
+        return RedisPaymentRepository(Redis.from_url(settings.redis_url))
+
+    return InMemoryPaymentRepository()
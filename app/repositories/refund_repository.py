@@ -0,0 +1,166 @@
+"""
+Refund storage backends: in-memory for a single process, Redis for multi-worker deployments.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.constants import (
+    STORAGE_BACKEND_REDIS,
+    REFUND_KEY,
+    REFUNDS_BY_CREATED_KEY,
+    REFUNDS_BY_PAYMENT_INTENT_KEY
+)
+from app.models.refund import RefundResponse
+
+
+class RefundRepository(ABC):
+    """Async storage interface for refund records."""
+
+    @abstractmethod
+    async def add(self, refund: RefundResponse) -> None:
+        """
+        Store a new refund and index it.
+
+        Args:
+            refund: Refund to store
+        """
+
+    @abstractmethod
+    async def get(self, refund_id: str) -> Optional[RefundResponse]:
+        """
+        Get a refund by ID.
+
+        Args:
+            refund_id: Refund ID
+
+        Returns:
+            Refund or None
+        """
+
+    @abstractmethod
+    async def list_latest(
+        self,
+        payment_intent_id: Optional[str],
+        limit: int
+    ) -> List[RefundResponse]:
+        """
+        Get the most recent refunds, newest first.
+
+        Args:
+            payment_intent_id: Filter by payment intent ID
+            limit: Maximum number of refunds to return
+
+        Returns:
+            List of refunds
+        """
+
+    async def close(self) -> None:
+        """Release any connections held by the backend."""
+
+
+class InMemoryRefundRepository(RefundRepository):
+    """Per-process refund store; state is not shared between workers."""
+
+    def __init__(self):
+        """Initialize empty store and indexes."""
+        self._refunds: Dict[str, RefundResponse] = {}
+        # Refund IDs in creation order
+        self._order: List[str] = []
+        # Refund IDs per payment intent, in creation order
+        self._by_payment_intent: Dict[str, List[str]] = {}
+
+    async def add(self, refund: RefundResponse) -> None:
+        self._refunds[refund.id] = refund
+        self._order.append(refund.id)
+        self._by_payment_intent.setdefault(refund.payment_intent_id, []).append(refund.id)
+
+    async def get(self, refund_id: str) -> Optional[RefundResponse]:
+        return self._refunds.get(refund_id)
+
+    async def list_latest(
+        self,
+        payment_intent_id: Optional[str],
+        limit: int
+    ) -> List[RefundResponse]:
+        if payment_intent_id:
+            ids = self._by_payment_intent.get(payment_intent_id, [])
+        else:
+            ids = self._order
+
+        # Both indexes are in creation order, so newest first is the reversed tail
+        page_ids = ids[max(len(ids) - limit, 0):]
+        return [self._refunds[refund_id] for refund_id in reversed(page_ids)]
+
+
+class RedisRefundRepository(RefundRepository):
+    """
+    Refund store shared by all workers.
+
+    Each refund is a JSON string under refund:{id}, indexed by sorted sets
+    scored by the Stripe creation timestamp.
+    """
+
+    def __init__(self, redis: Redis):
+        """
+        Initialize repository.
+
+        Args:
+            redis: Async Redis client
+        """
+        self._redis = redis
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        await self._redis.aclose()
+
+    async def add(self, refund: RefundResponse) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(REFUND_KEY.format(refund_id=refund.id), refund.model_dump_json())
+            pipe.zadd(REFUNDS_BY_CREATED_KEY, {refund.id: refund.created_at})
+            pipe.zadd(
+                REFUNDS_BY_PAYMENT_INTENT_KEY.format(payment_intent_id=refund.payment_intent_id),
+                {refund.id: refund.created_at}
+            )
+            await pipe.execute()
+
+    async def get(self, refund_id: str) -> Optional[RefundResponse]:
+        raw = await self._redis.get(REFUND_KEY.format(refund_id=refund_id))
+        return RefundResponse.model_validate_json(raw) if raw is not None else None
+
+    async def list_latest(
+        self,
+        payment_intent_id: Optional[str],
+        limit: int
+    ) -> List[RefundResponse]:
+        # ZREVRANGE 0 -1 would mean "everything", not "nothing"
+        if limit <= 0:
+            return []
+
+        index_key = (
+            REFUNDS_BY_PAYMENT_INTENT_KEY.format(payment_intent_id=payment_intent_id)
+            if payment_intent_id else REFUNDS_BY_CREATED_KEY
+        )
+        page_ids = await self._redis.zrevrange(index_key, 0, limit - 1)
+        if not page_ids:
+            return []
+
+        raws = await self._redis.mget([
+            REFUND_KEY.format(refund_id=refund_id.decode()) for refund_id in page_ids
+        ])
+        return [RefundResponse.model_validate_json(raw) for raw in raws if raw is not None]
+
+
+def create_refund_repository() -> RefundRepository:
+    """
+    Build the refund repository selected by STORAGE_BACKEND.
+
+    Returns:
+        Redis-backed repository, or an in-memory one by default
+    """
+    if settings.storage_backend == STORAGE_BACKEND_REDIS:
+        return RedisRefundRepository(Redis.from_url(settings.redis_url))
+
+    return InMemoryRefundRepository()
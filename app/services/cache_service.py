@@ -0,0 +1,86 @@
+"""
+Cache service for short-lived Stripe read results backed by Redis.
+"""
+from typing import Any, Optional
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+
+class CacheService:
+    """Read-through JSON cache; every operation is a no-op when Redis is not configured."""
+
+    def __init__(self):
+        """Initialize cache service with a Redis client if REDIS_URL is set."""
+        self._redis: Optional[Redis] = (
+            Redis.from_url(settings.redis_url) if settings.redis_url else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether values are actually cached (Redis is configured)."""
+        return self._redis is not None
+
+    async def close(self) -> None:
+        """Close the Redis connection pool, if any."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded value or None on miss (or if Redis is unavailable)
+        """
+        if self._redis is None:
+            return None
+
+        try:
+            raw = await self._redis.get(key)
+        except RedisError:
+            return None
+
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        """
+        Store a value with an expiry.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Time to live in seconds
+        """
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.set(key, orjson.dumps(value), ex=ttl)
+        except RedisError:
+            pass
+
+    async def delete(self, key: str) -> None:
+        """
+        Drop a cached value.
+
+        Args:
+            key: Cache key
+        """
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.delete(key)
+        except RedisError:
+            pass
+
+
+# Global service instance
+cache_service = CacheService()
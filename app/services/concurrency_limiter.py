@@ -0,0 +1,96 @@
+"""
+Per-customer concurrent request limiter backed by a Redis sorted set.
+"""
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.constants import CUSTOMER_CONCURRENCY_KEY
+from app.core.exceptions import TooManyConcurrentRequestsError
+
+# Drop stale entries, then admit the request only if the customer is under the limit.
+ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+if redis.call('ZCARD', key) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('EXPIRE', key, window)
+return 1
+"""
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests per customer; a no-op when Redis is not configured."""
+
+    def __init__(self):
+        """Initialize limiter with a Redis client if REDIS_URL is set."""
+        self._redis: Optional[Redis] = (
+            Redis.from_url(settings.redis_url) if settings.redis_url else None
+        )
+        self._acquire = (
+            self._redis.register_script(ACQUIRE_SCRIPT) if self._redis is not None else None
+        )
+
+    async def close(self) -> None:
+        """Close the Redis connection pool, if any."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    @asynccontextmanager
+    async def slot(self, customer_id: str) -> AsyncIterator[None]:
+        """
+        Hold one of the customer's concurrent request slots.
+
+        Entries older than the window are treated as leaked (e.g. a crashed worker)
+        and evicted. Redis failures let the request through rather than reject it.
+
+        Args:
+            customer_id: Customer (tenant) the request is made for
+
+        Raises:
+            TooManyConcurrentRequestsError: If the customer is at the limit
+        """
+        if self._redis is None:
+            yield
+            return
+
+        key = CUSTOMER_CONCURRENCY_KEY.format(customer_id=customer_id)
+        member = uuid.uuid4().hex
+
+        try:
+            acquired = await self._acquire(
+                keys=[key],
+                args=[
+                    time.time(),
+                    settings.customer_concurrency_window,
+                    settings.max_concurrent_per_customer,
+                    member
+                ]
+            )
+        except RedisError:
+            acquired = None
+
+        if acquired == 0:
+            raise TooManyConcurrentRequestsError()
+
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    await self._redis.zrem(key, member)
+                except RedisError:
+                    pass
+
+
+# Global service instance
+concurrency_limiter = ConcurrencyLimiter()
@@ -2,65 +2,105 @@
 Payment service for handling payment business logic.
 """
 import uuid
-from datetime import datetime
-from decimal import Decimal
-from typing import List, Optional
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
 
-from app.models.payment import PaymentCreateRequest, PaymentResponse, PaymentListResponse
-from app.services.stripe_service import StripeService
-from app.core.singleton import Singleton
-from app.constants import PaymentStatus, ErrorMessages, SuccessMessages
+from app.models.payment import PaymentCreateRequest, PaymentRecord, PaymentListResponse
+from app.repositories.payment_repository import (
+    InMemoryPaymentRepository,
+    PaymentRepository,
+    create_payment_repository
+)
+from app.services.cache_service import CacheService, cache_service
+from app.services.stripe_service import StripeService, stripe_service
+from app.constants import (
+    PaymentStatus,
+    ErrorMessages,
+    SuccessMessages,
+    PAYMENT_STATUS_CACHE_KEY,
+    STRIPE_READ_PAYMENT_INTENT
+)
 
+_UTC = timezone.utc
 
-class PaymentService(metaclass=Singleton):
+
+class PaymentService:
     """Service for handling payment operations."""
     
-    def __init__(self, stripe_service: StripeService):
+    def __init__(
+        self,
+        stripe_service: StripeService,
+        cache_service: CacheService,
+        repository: Optional[PaymentRepository] = None
+    ):
         """
         Initialize payment service.
         
         Args:
             stripe_service: Stripe service instance
+            cache_service: Shared cache holding live payment intent statuses
+            repository: Payment storage backend (in-memory if not given)
         """
         self._stripe_service = stripe_service
-        # In a real application, this would be a database
-        self._payments = {}
+        self._cache_service = cache_service
+        self._repository = repository or InMemoryPaymentRepository()
+        # Webhook handlers by Stripe event type; other event types are ignored
+        self._webhook_handlers: Dict[str, Callable[[dict], Awaitable[None]]] = {
+            "payment_intent.succeeded": self._handle_payment_succeeded,
+            "payment_intent.payment_failed": self._handle_payment_failed
+        }
+    
+    async def close(self) -> None:
+        """Release the storage backend's connections."""
+        await self._repository.close()
     
-    def create_payment(self, request: PaymentCreateRequest, test_mode: bool = False) -> PaymentResponse:
+    async def create_payment(
+        self,
+        request: PaymentCreateRequest,
+        test_mode: bool = False,
+        idempotency_key: Optional[str] = None
+    ) -> PaymentRecord:
         """
         Create a new payment.
         
         Args:
             request: Payment creation request
             test_mode: If True, creates a test payment that will be automatically successful
+            idempotency_key: Client-supplied key that makes retries safe
             
         Returns:
-            Payment response
+            Payment response (the existing one if Stripe replayed a previous create)
         """
-        # Convert amount to cents for Stripe
-        amount_cents = int(request.amount * 100)
-        
         # Create Stripe payment intent
         if test_mode:
-            stripe_intent = self._stripe_service.create_test_payment_intent(
-                amount=amount_cents,
+            stripe_intent = await self._stripe_service.create_test_payment_intent(
+                amount=request.amount,
                 currency=request.currency,
                 customer_id=request.customer_id,
-                metadata=request.metadata
+                metadata=request.metadata,
+                idempotency_key=idempotency_key
             )
         else:
-            stripe_intent = self._stripe_service.create_payment_intent(
-                amount=amount_cents,
+            stripe_intent = await self._stripe_service.create_payment_intent(
+                amount=request.amount,
                 currency=request.currency,
                 customer_id=request.customer_id,
-                metadata=request.metadata
+                metadata=request.metadata,
+                idempotency_key=idempotency_key
             )
         
+        # A retried key returns the original intent; don't record it twice
+        existing = await self._repository.get_by_intent(stripe_intent.id)
+        if existing:
+            return existing
+        
         # Create payment record
         payment_id = str(uuid.uuid4())
-        now = datetime.utcnow()
+        now = datetime.now(_UTC)
         
-        payment = PaymentResponse(
+        # All values are produced here or already validated by the request model
+        payment = PaymentRecord(
             id=payment_id,
             amount=request.amount,
             currency=request.currency,
@@ -73,12 +113,11 @@ class PaymentService(metaclass=Singleton):
             metadata=request.metadata
         )
         
-        # Store payment (in real app, save to database)
-        self._payments[payment_id] = payment
+        await self._repository.add(payment)
         
         return payment
     
-    def get_payment(self, payment_id: str) -> Optional[PaymentResponse]:
+    async def get_payment(self, payment_id: str) -> Optional[PaymentRecord]:
         """
         Get payment by ID.
         
@@ -88,14 +127,38 @@ class PaymentService(metaclass=Singleton):
         Returns:
             Payment response or None
         """
-        return self._payments.get(payment_id)
+        return await self._repository.get(payment_id)
     
-    def get_payments(
+    async def iter_payments(
         self, 
         customer_id: Optional[str] = None,
         page: int = 1,
         per_page: int = 10
-    ) -> List[PaymentResponse]:
+    ) -> AsyncIterator[PaymentRecord]:
+        """
+        Iterate over a page of payments, newest first, one record at a time.
+        
+        The page is fetched up front, so payments created while the caller is
+        still consuming the iterator can't break it.
+        
+        Args:
+            customer_id: Filter by customer ID
+            page: Page number
+            per_page: Items per page
+            
+        Yields:
+            Payments on the requested page
+        """
+        payments = await self.get_payments(customer_id=customer_id, page=page, per_page=per_page)
+        for payment in payments:
+            yield payment
+    
+    async def get_payments(
+        self, 
+        customer_id: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 10
+    ) -> List[PaymentRecord]:
         """
         Get payments with pagination.
         
@@ -107,26 +170,29 @@ class PaymentService(metaclass=Singleton):
         Returns:
             List of payments
         """
-        payments = list(self._payments.values())
-        
-        # Filter by customer if provided
-        if customer_id:
-            payments = [p for p in payments if p.customer_id == customer_id]
-        
-        # Sort by creation date (newest first)
-        payments.sort(key=lambda p: p.created_at, reverse=True)
-        
-        # Apply pagination
-        start = (page - 1) * per_page
-        end = start + per_page
+        return await self._repository.list_page(
+            customer_id=customer_id,
+            offset=(page - 1) * per_page,
+            limit=per_page
+        )
+    
+    async def count_payments(self, customer_id: Optional[str] = None) -> int:
+        """
+        Count payments.
         
-        return payments[start:end]
+        Args:
+            customer_id: Filter by customer ID
+            
+        Returns:
+            Number of payments
+        """
+        return await self._repository.count(customer_id=customer_id)
     
-    def update_payment_status(
+    async def update_payment_status(
         self, 
         payment_id: str, 
         status: PaymentStatus
-    ) -> Optional[PaymentResponse]:
+    ) -> Optional[PaymentRecord]:
         """
         Update payment status.
         
@@ -135,49 +201,51 @@ class PaymentService(metaclass=Singleton):
             status: New status
             
         Returns:
-            Updated payment or None
+            Updated payment (unchanged if it already had the status) or None
         """
-        payment = self._payments.get(payment_id)
-        if payment:
-            payment.status = status
-            payment.updated_at = datetime.utcnow()
-            self._payments[payment_id] = payment
+        payment = await self._repository.get(payment_id)
+        if payment and payment.status != status:
+            payment = replace(payment, status=status, updated_at=datetime.now(_UTC))
+            await self._repository.save(payment)
             
         return payment
     
-    def process_webhook(self, event_data: dict) -> None:
+    async def process_webhook(self, event_data: dict) -> None:
         """
         Process Stripe webhook events.
         
         Args:
             event_data: Stripe webhook event data
         """
-        event_type = event_data.get("type")
-        
-        if event_type == "payment_intent.succeeded":
-            self._handle_payment_succeeded(event_data["data"]["object"])
-        elif event_type == "payment_intent.payment_failed":
-            self._handle_payment_failed(event_data["data"]["object"])
+        handler = self._webhook_handlers.get(event_data.get("type"))
+        if handler is not None:
+            await handler(event_data["data"]["object"])
     
-    def _handle_payment_succeeded(self, payment_intent: dict) -> None:
+    async def _invalidate_intent(self, payment_intent_id: str) -> None:
+        """Drop cached copies of a payment intent, in process and in Redis."""
+        self._stripe_service.invalidate(STRIPE_READ_PAYMENT_INTENT, payment_intent_id)
+        await self._cache_service.delete(
+            PAYMENT_STATUS_CACHE_KEY.format(payment_intent_id=payment_intent_id)
+        )
+    
+    async def _handle_payment_succeeded(self, payment_intent: dict) -> None:
         """Handle successful payment webhook."""
-        stripe_payment_intent_id = payment_intent["id"]
-        
-        # Find payment by Stripe payment intent ID
-        for payment in self._payments.values():
-            if payment.stripe_payment_intent_id == stripe_payment_intent_id:
-                self.update_payment_status(payment.id, PaymentStatus.SUCCEEDED)
-                break
+        await self._invalidate_intent(payment_intent["id"])
+        payment = await self._repository.get_by_intent(payment_intent["id"])
+        if payment:
+            await self.update_payment_status(payment.id, PaymentStatus.SUCCEEDED)
     
-    def _handle_payment_failed(self, payment_intent: dict) -> None:
+    async def _handle_payment_failed(self, payment_intent: dict) -> None:
         """Handle failed payment webhook."""
-        stripe_payment_intent_id = payment_intent["id"]
-        
-        # Find payment by Stripe payment intent ID
-        for payment in self._payments.values():
-            if payment.stripe_payment_intent_id == stripe_payment_intent_id:
-                self.update_payment_status(payment.id, PaymentStatus.FAILED)
-                break
-
+        await self._invalidate_intent(payment_intent["id"])
+        payment = await self._repository.get_by_intent(payment_intent["id"])
+        if payment:
+            await self.update_payment_status(payment.id, PaymentStatus.FAILED)
 
 
+# Global service instance
+payment_service = PaymentService(
+    stripe_service=stripe_service,
+    cache_service=cache_service,
+    repository=create_payment_repository()
+)
@@ -1,74 +1,87 @@
 """
 Refund service for handling refund operations.
 """
-from decimal import Decimal
-from typing import Dict, List, Optional
-from uuid import uuid4
+from typing import List, Optional
 
 from app.models.refund import RefundResponse
-from app.services.stripe_service import StripeService
-from app.core.singleton import Singleton
+from app.repositories.refund_repository import (
+    InMemoryRefundRepository,
+    RefundRepository,
+    create_refund_repository
+)
+from app.services.stripe_service import StripeService, stripe_service
 
 
-class RefundService(metaclass=Singleton):
+class RefundService:
     """Service for handling refund operations."""
     
-    def __init__(self, stripe_service: StripeService):
+    def __init__(
+        self,
+        stripe_service: StripeService,
+        repository: Optional[RefundRepository] = None
+    ):
         """
         Initialize refund service.
         
         Args:
             stripe_service: Stripe service instance
+            repository: Refund storage backend (in-memory if not given)
         """
         self._stripe_service = stripe_service
-        self._refunds: Dict[str, RefundResponse] = {}
+        self._repository = repository or InMemoryRefundRepository()
     
-    def create_refund(
+    async def close(self) -> None:
+        """Release the storage backend's connections."""
+        await self._repository.close()
+    
+    async def create_refund(
         self, 
         payment_intent_id: str, 
-        amount: Optional[Decimal] = None,
-        reason: Optional[str] = None
+        amount: Optional[int] = None,
+        reason: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> RefundResponse:
         """
         Create a refund for a payment.
         
         Args:
             payment_intent_id: Stripe payment intent ID
-            amount: Refund amount (if None, refunds full amount)
+            amount: Refund amount in cents (if None, refunds full amount)
             reason: Refund reason
+            idempotency_key: Client-supplied key that makes retries safe
             
         Returns:
-            Created refund response
+            Created refund response (the existing one if Stripe replayed a previous create)
         """
-        # Convert amount to cents if provided
-        amount_cents = None
-        if amount:
-            amount_cents = int(amount * 100)
-        
         # Create refund in Stripe
-        stripe_refund = self._stripe_service.create_refund(
+        stripe_refund = await self._stripe_service.create_refund(
             payment_intent_id=payment_intent_id,
-            amount=amount_cents,
-            reason=reason
+            amount=amount,
+            reason=reason,
+            idempotency_key=idempotency_key
         )
         
-        # Create refund response
-        refund = RefundResponse(
+        # A retried key returns the original refund; don't record it twice
+        existing = await self._repository.get(stripe_refund.id)
+        if existing:
+            return existing
+        
+        # Create refund response (values come from Stripe and the validated request)
+        refund = RefundResponse.model_construct(
             id=stripe_refund.id,
             payment_intent_id=stripe_refund.payment_intent,
-            amount=Decimal(stripe_refund.amount) / 100,  # Convert from cents
+            amount=stripe_refund.amount,
             currency=stripe_refund.currency,
             status=stripe_refund.status,
             reason=reason,
             created_at=stripe_refund.created
         )
         
-        # Store in memory
-        self._refunds[refund.id] = refund
+        await self._repository.add(refund)
         
         return refund
     
-    def get_refund(self, refund_id: str) -> Optional[RefundResponse]:
+    async def get_refund(self, refund_id: str) -> Optional[RefundResponse]:
         """
         Get refund by ID.
         
@@ -78,9 +91,9 @@ class RefundService(metaclass=Singleton):
         Returns:
             Refund response or None if not found
         """
-        return self._refunds.get(refund_id)
+        return await self._repository.get(refund_id)
     
-    def list_refunds(
+    async def list_refunds(
         self, 
         payment_intent_id: Optional[str] = None,
         limit: int = 10
@@ -95,14 +108,11 @@ class RefundService(metaclass=Singleton):
         Returns:
             List of refund responses
         """
-        refunds = list(self._refunds.values())
-        
-        # Filter by payment intent ID if provided
-        if payment_intent_id:
-            refunds = [r for r in refunds if r.payment_intent_id == payment_intent_id]
-        
-        # Sort by creation date (newest first)
-        refunds.sort(key=lambda x: x.created_at, reverse=True)
-        
-        # Apply limit
-        return refunds[:limit]
+        return await self._repository.list_latest(payment_intent_id=payment_intent_id, limit=limit)
+
+
+# Global service instance
+refund_service = RefundService(
+    stripe_service=stripe_service,
+    repository=create_refund_repository()
+)
@@ -1,32 +1,135 @@
 """
 Stripe service for handling Stripe API interactions.
 """
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
 import stripe
-from typing import Optional, Dict, Any
+from aiolimiter import AsyncLimiter
+from cachetools import TTLCache
 
 from app.config import settings
 from app.constants import (
+    STRIPE_READ_ACCOUNT,
+    STRIPE_READ_CUSTOMER,
+    STRIPE_READ_PAYMENT_INTENT,
+    STRIPE_READ_REFUND,
+    STRIPE_READ_SUBSCRIPTION,
     STRIPE_CURRENCY_USD,
     STRIPE_TEST_PAYMENT_METHOD,
     STRIPE_RETURN_URL,
     PaymentStatus
 )
-from app.core.singleton import Singleton
+
+T = TypeVar("T")
+
+# Param fragments shared by every payment intent create; never mutated. These stay
+# plain dicts: the SDK only expands real dicts, so a MappingProxyType would be sent as its repr.
+_AUTOMATIC_PAYMENT_METHODS = {"enabled": True}
+_TEST_INTENT_PARAMS = {
+    "automatic_payment_methods": _AUTOMATIC_PAYMENT_METHODS,
+    "confirm": True,
+    "payment_method": STRIPE_TEST_PAYMENT_METHOD,  # Test token for successful payment
+    "return_url": STRIPE_RETURN_URL
+}
 
 
-class StripeService(metaclass=Singleton):
+class StripeService:
     """Service for interacting with Stripe API."""
     
     def __init__(self):
-        """Initialize Stripe service with API key."""
-        stripe.api_key = settings.stripe_secret_key
+        """Initialize Stripe service with an async client sharing one connection pool."""
+        self._http_client = stripe.HTTPXClient()
+        self._client = stripe.StripeClient(
+            settings.stripe_secret_key.get_secret_value(),
+            http_client=self._http_client,
+            max_network_retries=settings.stripe_max_network_retries
+        )
+        # Bound in-flight calls and request rate so bursts don't trip Stripe's limits
+        self._semaphore = asyncio.Semaphore(settings.stripe_max_concurrency)
+        self._rate_limiter = AsyncLimiter(settings.stripe_rps, time_period=1)
+        # Short-lived, per-process cache of retrieved objects keyed by (kind, id)
+        self._read_cache: TTLCache = TTLCache(
+            maxsize=settings.stripe_read_cache_size,
+            ttl=settings.stripe_read_cache_ttl
+        )
+    
+    async def close(self) -> None:
+        """Close the pooled HTTP connections to Stripe."""
+        await self._http_client.close_async()
+    
+    async def _request(self, method: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Perform an outbound Stripe call under the concurrency and rate limits.
+        
+        Args:
+            method: Async Stripe client method
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+            
+        Returns:
+            Result of the Stripe call
+        """
+        async with self._rate_limiter, self._semaphore:
+            return await method(*args, **kwargs)
+    
+    async def _cached_read(
+        self,
+        kind: str,
+        object_id: str,
+        method: Callable[..., Awaitable[T]],
+        refresh: bool = False
+    ) -> T:
+        """
+        Retrieve a Stripe object through the read cache.
+        
+        Args:
+            kind: Object kind, used to namespace the cache key
+            object_id: Stripe object ID
+            method: Async Stripe client retrieve method
+            refresh: If True, skip the cached copy and replace it with a fresh one
+            
+        Returns:
+            Cached or freshly retrieved Stripe object
+        """
+        key = (kind, object_id)
+        cached = None if refresh else self._read_cache.get(key)
+        if cached is None:
+            cached = await self._request(method, object_id)
+            self._read_cache[key] = cached
+        return cached
+    
+    @staticmethod
+    def _idempotency_options(idempotency_key: Optional[str]) -> Dict[str, str]:
+        """
+        Build request options carrying an idempotency key.
+        
+        Args:
+            idempotency_key: Caller-supplied key, or None to generate one
+            
+        Returns:
+            Request options for a Stripe create call
+        """
+        return {"idempotency_key": idempotency_key or uuid.uuid4().hex}
+    
+    def invalidate(self, kind: str, object_id: str) -> None:
+        """
+        Drop a cached Stripe object so the next read goes to Stripe.
+        
+        Args:
+            kind: Object kind (one of the STRIPE_READ_* constants)
+            object_id: Stripe object ID
+        """
+        self._read_cache.pop((kind, object_id), None)
     
-    def create_payment_intent(
+    async def create_payment_intent(
         self, 
         amount: int, 
         currency: str = STRIPE_CURRENCY_USD, 
         customer_id: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None
     ) -> stripe.PaymentIntent:
         """
         Create a payment intent.
@@ -36,7 +139,7 @@ class StripeService(metaclass=Singleton):
             currency: Currency code
             customer_id: Stripe customer ID
             metadata: Additional metadata
-            confirm: Whether to confirm the payment immediately
+            idempotency_key: Key that makes retries of this create safe (generated if None)
             
         Returns:
             Stripe PaymentIntent object
@@ -44,7 +147,7 @@ class StripeService(metaclass=Singleton):
         intent_data = {
             "amount": amount,
             "currency": currency,
-            "automatic_payment_methods": {"enabled": True},
+            "automatic_payment_methods": _AUTOMATIC_PAYMENT_METHODS
         }
         
         if customer_id:
@@ -53,16 +156,19 @@ class StripeService(metaclass=Singleton):
         if metadata:
             intent_data["metadata"] = metadata
             
-        payment_intent = stripe.PaymentIntent.create(**intent_data)
-        
-        return payment_intent
+        return await self._request(
+            self._client.payment_intents.create_async,
+            params=intent_data,
+            options=self._idempotency_options(idempotency_key)
+        )
     
-    def create_test_payment_intent(
+    async def create_test_payment_intent(
         self, 
         amount: int, 
         currency: str = STRIPE_CURRENCY_USD, 
         customer_id: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None
     ) -> stripe.PaymentIntent:
         """
         Create a test payment intent that will be automatically successful.
@@ -72,6 +178,7 @@ class StripeService(metaclass=Singleton):
             currency: Currency code
             customer_id: Stripe customer ID
             metadata: Additional metadata
+            idempotency_key: Key that makes retries of this create safe (generated if None)
             
         Returns:
             Stripe PaymentIntent object
@@ -80,10 +187,7 @@ class StripeService(metaclass=Singleton):
         intent_data = {
             "amount": amount,
             "currency": currency,
-            "automatic_payment_methods": {"enabled": True},
-            "confirm": True,
-            "payment_method": STRIPE_TEST_PAYMENT_METHOD,  # Test token for successful payment
-            "return_url": STRIPE_RETURN_URL
+            **_TEST_INTENT_PARAMS
         }
         
         if customer_id:
@@ -92,9 +196,13 @@ class StripeService(metaclass=Singleton):
         if metadata:
             intent_data["metadata"] = metadata
             
-        return stripe.PaymentIntent.create(**intent_data)
+        return await self._request(
+            self._client.payment_intents.create_async,
+            params=intent_data,
+            options=self._idempotency_options(idempotency_key)
+        )
     
-    def create_customer(
+    async def create_customer(
         self, 
         email: str, 
         name: Optional[str] = None,
@@ -119,9 +227,9 @@ class StripeService(metaclass=Singleton):
         if metadata:
             customer_data["metadata"] = metadata
             
-        return stripe.Customer.create(**customer_data)
+        return await self._request(self._client.customers.create_async, params=customer_data)
     
-    def create_connect_account(
+    async def create_connect_account(
         self, 
         type: str = "express",
         country: str = "US",
@@ -151,9 +259,9 @@ class StripeService(metaclass=Singleton):
         if capabilities:
             account_data["capabilities"] = capabilities
             
-        return stripe.Account.create(**account_data)
+        return await self._request(self._client.accounts.create_async, params=account_data)
     
-    def create_account_link(
+    async def create_account_link(
         self, 
         account_id: str, 
         refresh_url: str,
@@ -172,18 +280,19 @@ class StripeService(metaclass=Singleton):
         Returns:
             Stripe AccountLink object
         """
-        return stripe.AccountLink.create(
-            account=account_id,
-            refresh_url=refresh_url,
-            return_url=return_url,
-            type=type
-        )
+        return await self._request(self._client.account_links.create_async, params={
+            "account": account_id,
+            "refresh_url": refresh_url,
+            "return_url": return_url,
+            "type": type,
+        })
     
-    def create_refund(
+    async def create_refund(
         self, 
         payment_intent_id: str, 
         amount: Optional[int] = None,
-        reason: Optional[str] = None
+        reason: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> stripe.Refund:
         """
         Create a refund for a payment.
@@ -192,6 +301,7 @@ class StripeService(metaclass=Singleton):
             payment_intent_id: Stripe payment intent ID
             amount: Refund amount in cents (if None, refunds full amount)
             reason: Refund reason (not used in Stripe API call)
+            idempotency_key: Key that makes retries of this create safe (generated if None)
             
         Returns:
             Stripe Refund object
@@ -204,14 +314,19 @@ class StripeService(metaclass=Singleton):
         # Note: Stripe API doesn't accept reason parameter in refund creation
         # Reason can be set later via refund update if needed
             
-        return stripe.Refund.create(**refund_data)
+        return await self._request(
+            self._client.refunds.create_async,
+            params=refund_data,
+            options=self._idempotency_options(idempotency_key)
+        )
     
-    def create_subscription(
+    async def create_subscription(
         self, 
         customer_id: str, 
         price_id: str,
         trial_period_days: Optional[int] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None
     ) -> stripe.Subscription:
         """
         Create a subscription.
@@ -221,6 +336,7 @@ class StripeService(metaclass=Singleton):
             price_id: Stripe price ID
             trial_period_days: Trial period in days
             metadata: Additional metadata
+            idempotency_key: Key that makes retries of this create safe (generated if None)
             
         Returns:
             Stripe Subscription object
@@ -236,9 +352,13 @@ class StripeService(metaclass=Singleton):
         if metadata:
             subscription_data["metadata"] = metadata
             
-        return stripe.Subscription.create(**subscription_data)
+        return await self._request(
+            self._client.subscriptions.create_async,
+            params=subscription_data,
+            options=self._idempotency_options(idempotency_key)
+        )
     
-    def cancel_subscription(self, subscription_id: str) -> stripe.Subscription:
+    async def cancel_subscription(self, subscription_id: str) -> stripe.Subscription:
         """
         Cancel a subscription.
         
@@ -248,37 +368,52 @@ class StripeService(metaclass=Singleton):
         Returns:
             Stripe Subscription object
         """
-        return stripe.Subscription.modify(
+        subscription = await self._request(
+            self._client.subscriptions.update_async,
             subscription_id,
-            cancel_at_period_end=True
+            params={"cancel_at_period_end": True}
         )
+        # Keep cached reads in step with the write
+        self._read_cache[(STRIPE_READ_SUBSCRIPTION, subscription_id)] = subscription
+        return subscription
     
-    def get_payment_intent(self, payment_intent_id: str) -> stripe.PaymentIntent:
+    async def get_payment_intent(
+        self,
+        payment_intent_id: str,
+        refresh: bool = False
+    ) -> stripe.PaymentIntent:
         """
         Retrieve a payment intent.
         
         Args:
             payment_intent_id: Stripe payment intent ID
+            refresh: If True, bypass the read cache (the fresh copy is still cached)
             
         Returns:
             Stripe PaymentIntent object
         """
-        return stripe.PaymentIntent.retrieve(payment_intent_id)
+        return await self._cached_read(
+            STRIPE_READ_PAYMENT_INTENT,
+            payment_intent_id,
+            self._client.payment_intents.retrieve_async,
+            refresh=refresh
+        )
     
-    def get_payment_intent_status(self, payment_intent_id: str) -> str:
+    async def get_payment_intent_status(self, payment_intent_id: str, refresh: bool = False) -> str:
         """
         Get payment intent status from Stripe.
         
         Args:
             payment_intent_id: Stripe payment intent ID
+            refresh: If True, bypass the read cache (the fresh copy is still cached)
             
         Returns:
             Payment intent status (e.g., 'succeeded', 'pending', 'requires_payment_method')
         """
-        payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+        payment_intent = await self.get_payment_intent(payment_intent_id, refresh=refresh)
         return payment_intent.status
     
-    def get_customer(self, customer_id: str) -> stripe.Customer:
+    async def get_customer(self, customer_id: str) -> stripe.Customer:
         """
         Retrieve a customer.
         
@@ -288,9 +423,11 @@ class StripeService(metaclass=Singleton):
         Returns:
             Stripe Customer object
         """
-        return stripe.Customer.retrieve(customer_id)
+        return await self._cached_read(
+            STRIPE_READ_CUSTOMER, customer_id, self._client.customers.retrieve_async
+        )
     
-    def get_account(self, account_id: str) -> stripe.Account:
+    async def get_account(self, account_id: str) -> stripe.Account:
         """
         Retrieve a Connect account.
         
@@ -300,9 +437,11 @@ class StripeService(metaclass=Singleton):
         Returns:
             Stripe Account object
         """
-        return stripe.Account.retrieve(account_id)
+        return await self._cached_read(
+            STRIPE_READ_ACCOUNT, account_id, self._client.accounts.retrieve_async
+        )
     
-    def get_subscription(self, subscription_id: str) -> stripe.Subscription:
+    async def get_subscription(self, subscription_id: str) -> stripe.Subscription:
         """
         Retrieve a subscription.
         
@@ -312,9 +451,11 @@ class StripeService(metaclass=Singleton):
         Returns:
             Stripe Subscription object
         """
-        return stripe.Subscription.retrieve(subscription_id)
+        return await self._cached_read(
+            STRIPE_READ_SUBSCRIPTION, subscription_id, self._client.subscriptions.retrieve_async
+        )
     
-    def get_refund(self, refund_id: str) -> stripe.Refund:
+    async def get_refund(self, refund_id: str) -> stripe.Refund:
         """
         Retrieve a refund.
         
@@ -324,7 +465,9 @@ class StripeService(metaclass=Singleton):
         Returns:
             Stripe Refund object
         """
-        return stripe.Refund.retrieve(refund_id)
+        return await self._cached_read(
+            STRIPE_READ_REFUND, refund_id, self._client.refunds.retrieve_async
+        )
 
 
 # Global service instance
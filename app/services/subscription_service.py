@@ -2,20 +2,36 @@
 Subscription service for handling subscription business logic.
 """
 import uuid
-from datetime import datetime
-from typing import List, Optional
+from bisect import bisect_left
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
 from app.models.subscription import (
     SubscriptionCreateRequest, 
-    SubscriptionResponse, 
+    SubscriptionRecord, 
     SubscriptionListResponse
 )
-from app.services.stripe_service import StripeService
+from app.services.stripe_service import StripeService, stripe_service
 from app.constants import SubscriptionStatus, ErrorMessages, SuccessMessages
-from app.core.singleton import Singleton
 
+_UTC = timezone.utc
 
-class SubscriptionService(metaclass=Singleton):
+
+def _ts(timestamp: Optional[int]) -> Optional[datetime]:
+    """
+    Convert a Stripe Unix timestamp to an aware UTC datetime.
+    
+    Args:
+        timestamp: Seconds since the epoch, or None
+        
+    Returns:
+        UTC datetime, or None if no timestamp was given
+    """
+    return datetime.fromtimestamp(timestamp, _UTC) if timestamp else None
+
+
+class SubscriptionService:
     """Service for handling subscription operations."""
     
     def __init__(self, stripe_service: StripeService):
@@ -27,40 +43,57 @@ class SubscriptionService(metaclass=Singleton):
         """
         self._stripe_service = stripe_service
         # In a real application, this would be a database
-        self._subscriptions = {}
+        self._subscriptions: Dict[str, SubscriptionRecord] = {}
+        # Subscription IDs in creation order
+        self._order: List[str] = []
+        # Subscription IDs per customer, in creation order
+        self._by_customer: Dict[str, List[str]] = {}
+        # Local subscription ID per Stripe subscription ID
+        self._by_stripe_id: Dict[str, str] = {}
     
-    def create_subscription(self, request: SubscriptionCreateRequest) -> SubscriptionResponse:
+    async def create_subscription(
+        self,
+        request: SubscriptionCreateRequest,
+        idempotency_key: Optional[str] = None
+    ) -> SubscriptionRecord:
         """
         Create a new subscription.
         
         Args:
             request: Subscription creation request
+            idempotency_key: Client-supplied key that makes retries safe
             
         Returns:
             Subscription response
         """
         # Create Stripe subscription
-        stripe_subscription = self._stripe_service.create_subscription(
+        stripe_subscription = await self._stripe_service.create_subscription(
             customer_id=request.customer_id,
             price_id=request.price_id,
             trial_period_days=request.trial_period_days,
-            metadata=request.metadata
+            metadata=request.metadata,
+            idempotency_key=idempotency_key
         )
         
+        # A retried key returns the original subscription; don't record it twice
+        existing_id = self._by_stripe_id.get(stripe_subscription.id)
+        if existing_id:
+            return self._subscriptions[existing_id]
+        
         # Create subscription record
-        subscription_id = str(uuid.uuid4())
-        now = datetime.utcnow()
+        subscription_id = uuid.uuid4().hex
+        now = datetime.now(_UTC)
         
-        subscription = SubscriptionResponse(
+        subscription = SubscriptionRecord(
             id=subscription_id,
             customer_id=request.customer_id,
-            status=SubscriptionStatus.ACTIVE if not request.trial_period_days else SubscriptionStatus.TRIALING,
-            current_period_start=datetime.fromtimestamp(stripe_subscription.current_period_start),
-            current_period_end=datetime.fromtimestamp(stripe_subscription.current_period_end),
-            trial_start=datetime.fromtimestamp(stripe_subscription.trial_start) if stripe_subscription.trial_start else None,
-            trial_end=datetime.fromtimestamp(stripe_subscription.trial_end) if stripe_subscription.trial_end else None,
+            status=SubscriptionStatus.TRIALING if request.trial_period_days else SubscriptionStatus.ACTIVE,
+            current_period_start=_ts(stripe_subscription.current_period_start),
+            current_period_end=_ts(stripe_subscription.current_period_end),
+            trial_start=_ts(stripe_subscription.trial_start),
+            trial_end=_ts(stripe_subscription.trial_end),
             cancel_at_period_end=stripe_subscription.cancel_at_period_end,
-            canceled_at=datetime.fromtimestamp(stripe_subscription.canceled_at) if stripe_subscription.canceled_at else None,
+            canceled_at=_ts(stripe_subscription.canceled_at),
             stripe_subscription_id=stripe_subscription.id,
             metadata=request.metadata,
             created_at=now,
@@ -69,10 +102,13 @@ class SubscriptionService(metaclass=Singleton):
         
         # Store subscription (in real app, save to database)
         self._subscriptions[subscription_id] = subscription
+        self._order.append(subscription_id)
+        self._by_customer.setdefault(request.customer_id, []).append(subscription_id)
+        self._by_stripe_id[stripe_subscription.id] = subscription_id
         
         return subscription
     
-    def get_subscription(self, subscription_id: str) -> Optional[SubscriptionResponse]:
+    def get_subscription(self, subscription_id: str) -> Optional[SubscriptionRecord]:
         """
         Get subscription by ID.
         
@@ -88,35 +124,80 @@ class SubscriptionService(metaclass=Singleton):
         self, 
         customer_id: Optional[str] = None,
         page: int = 1,
-        per_page: int = 10
-    ) -> List[SubscriptionResponse]:
+        per_page: int = 10,
+        after: Optional[str] = None
+    ) -> Tuple[List[SubscriptionRecord], Optional[str]]:
         """
-        Get subscriptions with pagination.
+        Get subscriptions, newest first, by page number or by cursor.
+        
+        With a cursor the page starts right after that subscription, so deep pages
+        cost the same as the first one and don't shift when new subscriptions arrive.
+        An unknown cursor yields an empty page.
         
         Args:
             customer_id: Filter by customer ID
-            page: Page number
+            page: Page number (ignored when after is given)
             per_page: Items per page
+            after: ID of the last subscription of the previous page
             
         Returns:
-            List of subscriptions
+            Subscriptions on the page and the cursor for the next page (None on the last page)
         """
-        subscriptions = list(self._subscriptions.values())
+        # Both indexes are in creation order, so the newest-first page is a reversed tail slice
+        ids = self._by_customer.get(customer_id, []) if customer_id else self._order
+        if after is None:
+            stop = max(len(ids) - (page - 1) * per_page, 0)
+        else:
+            stop = self._position(ids, after)
+        start = max(stop - per_page, 0)
+        page_ids = ids[start:stop]
         
-        # Filter by customer if provided
+        subscriptions = [self._subscriptions[subscription_id] for subscription_id in reversed(page_ids)]
+        next_cursor = page_ids[0] if start > 0 else None
+        
+        return subscriptions, next_cursor
+    
+    def count_subscriptions(self, customer_id: Optional[str] = None) -> int:
+        """
+        Count subscriptions.
+        
+        Args:
+            customer_id: Filter by customer ID
+            
+        Returns:
+            Number of subscriptions
+        """
         if customer_id:
-            subscriptions = [s for s in subscriptions if s.customer_id == customer_id]
+            return len(self._by_customer.get(customer_id, []))
         
-        # Sort by creation date (newest first)
-        subscriptions.sort(key=lambda s: s.created_at, reverse=True)
+        return len(self._subscriptions)
+    
+    def _position(self, ids: List[str], subscription_id: str) -> int:
+        """
+        Find a subscription's position in a creation-order index.
+        
+        Args:
+            ids: Creation-order index
+            subscription_id: Subscription ID to look for
+            
+        Returns:
+            Position of the subscription, or 0 if it isn't in the index
+        """
+        subscription = self._subscriptions.get(subscription_id)
+        if subscription is None:
+            return 0
         
-        # Apply pagination
-        start = (page - 1) * per_page
-        end = start + per_page
+        # The index is sorted by created_at: seek to the timestamp, then step over ties
+        created_at = subscription.created_at
+        position = bisect_left(ids, created_at, key=lambda i: self._subscriptions[i].created_at)
+        while position < len(ids) and self._subscriptions[ids[position]].created_at == created_at:
+            if ids[position] == subscription_id:
+                return position
+            position += 1
         
-        return subscriptions[start:end]
+        return 0
     
-    def cancel_subscription(self, subscription_id: str) -> Optional[SubscriptionResponse]:
+    async def cancel_subscription(self, subscription_id: str) -> Optional[SubscriptionRecord]:
         """
         Cancel a subscription.
         
@@ -131,13 +212,16 @@ class SubscriptionService(metaclass=Singleton):
             return None
         
         # Cancel in Stripe
-        stripe_subscription = self._stripe_service.cancel_subscription(subscription.stripe_subscription_id)
+        stripe_subscription = await self._stripe_service.cancel_subscription(subscription.stripe_subscription_id)
         
         # Update local record
-        subscription.status = SubscriptionStatus.CANCELED
-        subscription.cancel_at_period_end = stripe_subscription.cancel_at_period_end
-        subscription.canceled_at = datetime.fromtimestamp(stripe_subscription.canceled_at) if stripe_subscription.canceled_at else None
-        subscription.updated_at = datetime.utcnow()
+        subscription = replace(
+            subscription,
+            status=SubscriptionStatus.CANCELED,
+            cancel_at_period_end=stripe_subscription.cancel_at_period_end,
+            canceled_at=_ts(stripe_subscription.canceled_at),
+            updated_at=datetime.now(_UTC)
+        )
         
         self._subscriptions[subscription_id] = subscription
         
@@ -147,7 +231,7 @@ class SubscriptionService(metaclass=Singleton):
         self, 
         subscription_id: str, 
         status: SubscriptionStatus
-    ) -> Optional[SubscriptionResponse]:
+    ) -> Optional[SubscriptionRecord]:
         """
         Update subscription status.
         
@@ -156,12 +240,11 @@ class SubscriptionService(metaclass=Singleton):
             status: New status
             
         Returns:
-            Updated subscription or None
+            Updated subscription (unchanged if it already had the status) or None
         """
         subscription = self._subscriptions.get(subscription_id)
-        if subscription:
-            subscription.status = status
-            subscription.updated_at = datetime.utcnow()
+        if subscription and subscription.status != status:
+            subscription = replace(subscription, status=status, updated_at=datetime.now(_UTC))
             self._subscriptions[subscription_id] = subscription
             
         return subscription
@@ -220,4 +303,5 @@ class SubscriptionService(metaclass=Singleton):
     #             break
 
 
-
+# Global service instance
+subscription_service = SubscriptionService(stripe_service=stripe_service)
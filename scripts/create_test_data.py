@@ -3,6 +3,7 @@
 Script to create test data in Stripe for the B2B Payments API.
 This helps set up the necessary test customers and products.
 """
+import asyncio
 import os
 import stripe
 from dotenv import load_dotenv
@@ -10,21 +11,18 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Set up Stripe
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
-
-def create_test_customer():
+async def create_test_customer(client):
     """Create a test customer in Stripe."""
     try:
-        customer = stripe.Customer.create(
-            email="test@example.com",
-            name="Test Customer",
-            description="Test customer for B2B Payments API",
-            metadata={
+        customer = await client.customers.create_async(params={
+            "email": "test@example.com",
+            "name": "Test Customer",
+            "description": "Test customer for B2B Payments API",
+            "metadata": {
                 "source": "api_test",
                 "environment": "sandbox"
             }
-        )
+        })
         print(f"✅ Test customer created: {customer.id}")
         print(f"   Email: {customer.email}")
         print(f"   Name: {customer.name}")
@@ -33,17 +31,17 @@ def create_test_customer():
         print(f"❌ Failed to create customer: {e}")
         return None
 
-def create_test_product():
+async def create_test_product(client):
     """Create a test product in Stripe."""
     try:
-        product = stripe.Product.create(
-            name="Test Product",
-            description="Test product for B2B Payments API demonstration",
-            metadata={
+        product = await client.products.create_async(params={
+            "name": "Test Product",
+            "description": "Test product for B2B Payments API demonstration",
+            "metadata": {
                 "source": "api_test",
                 "environment": "sandbox"
             }
-        )
+        })
         print(f"✅ Test product created: {product.id}")
         print(f"   Name: {product.name}")
         print(f"   Description: {product.description}")
@@ -52,19 +50,19 @@ def create_test_product():
         print(f"❌ Failed to create product: {e}")
         return None
 
-def create_test_price(product_id, amount=2000, currency="eur"):
+async def create_test_price(client, product_id, amount=2000, currency="eur"):
     """Create a test price for the product."""
     try:
-        price = stripe.Price.create(
-            product=product_id,
-            unit_amount=amount,  # 2000 cents = €20.00
-            currency=currency,
-            recurring=None,  # One-time payment
-            metadata={
+        # No "recurring" entry makes this a one-time price
+        price = await client.prices.create_async(params={
+            "product": product_id,
+            "unit_amount": amount,  # 2000 cents = €20.00
+            "currency": currency,
+            "metadata": {
                 "source": "api_test",
                 "environment": "sandbox"
             }
-        )
+        })
         print(f"✅ Test price created: {price.id}")
         print(f"   Amount: €{amount/100:.2f} {currency.upper()}")
         print(f"   Product: {price.product}")
@@ -73,36 +71,66 @@ def create_test_price(product_id, amount=2000, currency="eur"):
         print(f"❌ Failed to create price: {e}")
         return None
 
-def list_test_data():
-    """List existing test data."""
+async def list_test_data(client):
+    """List existing test data, fetching customers, products and prices concurrently."""
     print("\n📋 Existing Test Data:")
     
+    customers, products, prices = await asyncio.gather(
+        client.customers.list_async(params={"limit": 5}),
+        client.products.list_async(params={"limit": 5}),
+        client.prices.list_async(params={"limit": 5}),
+        return_exceptions=True
+    )
+    
     # List customers
-    try:
-        customers = stripe.Customer.list(limit=5)
+    if isinstance(customers, Exception):
+        print(f"❌ Failed to list customers: {customers}")
+    else:
         print(f"\n👥 Customers ({len(customers.data)}):")
         for customer in customers.data:
             print(f"   - {customer.id}: {customer.name} ({customer.email})")
-    except Exception as e:
-        print(f"❌ Failed to list customers: {e}")
     
     # List products
-    try:
-        products = stripe.Product.list(limit=5)
+    if isinstance(products, Exception):
+        print(f"❌ Failed to list products: {products}")
+    else:
         print(f"\n📦 Products ({len(products.data)}):")
         for product in products.data:
             print(f"   - {product.id}: {product.name}")
-    except Exception as e:
-        print(f"❌ Failed to list products: {e}")
     
     # List prices
-    try:
-        prices = stripe.Price.list(limit=5)
+    if isinstance(prices, Exception):
+        print(f"❌ Failed to list prices: {prices}")
+    else:
         print(f"\n💰 Prices ({len(prices.data)}):")
         for price in prices.data:
             print(f"   - {price.id}: €{price.unit_amount/100:.2f} {price.currency.upper()}")
-    except Exception as e:
-        print(f"❌ Failed to list prices: {e}")
+
+async def setup_test_data():
+    """List existing data, then create the customer and product concurrently and the product's price."""
+    http_client = stripe.HTTPXClient()
+    client = stripe.StripeClient(
+        os.getenv("STRIPE_SECRET_KEY"),
+        http_client=http_client
+    )
+    
+    try:
+        # List existing data
+        await list_test_data(client)
+        
+        print("\n" + "=" * 40)
+        print("Creating new test data...")
+        
+        # Create test customer, product and price
+        customer_id, product_id = await asyncio.gather(
+            create_test_customer(client),
+            create_test_product(client)
+        )
+        price_id = await create_test_price(client, product_id) if product_id else None
+    finally:
+        await http_client.close_async()
+    
+    return customer_id, price_id
 
 def main():
     """Main function to set up test data."""
@@ -117,23 +145,7 @@ def main():
     
     print(f"✅ Using Stripe key: {os.getenv('STRIPE_SECRET_KEY')[:12]}...")
     
-    # List existing data
-    list_test_data()
-    
-    print("\n" + "=" * 40)
-    print("Creating new test data...")
-    
-    # Create test customer
-    customer_id = create_test_customer()
-    
-    # Create test product
-    product_id = create_test_product()
-    
-    # Create test price
-    if product_id:
-        price_id = create_test_price(product_id)
-    else:
-        price_id = None
+    customer_id, price_id = asyncio.run(setup_test_data())
     
     print("\n" + "=" * 40)
     print("📝 Next Steps:")
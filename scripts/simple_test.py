@@ -3,26 +3,62 @@
 Simplified test script for the Stripe B2B Payments API.
 Focuses on core functionality without OAuth (which requires Connect setup).
 """
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
 
 # API base URL
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One pooled session for every call, so connections are kept alive between tests
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Bodies are encoded with orjson, so the content type has to be set by hand
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Largest page the list endpoints accept
+MAX_PER_PAGE = 100
+
+def fetch_all(url, key):
+    """
+    Fetch every item of a list endpoint over the shared session.
+    
+    Follows next_cursor where the endpoint returns one (subscriptions) and
+    otherwise steps through pages until total items have been read.
+    Returns the last response alongside the collected items.
+    """
+    items = []
+    params = {"page": 1, "per_page": MAX_PER_PAGE}
+    while True:
+        response = SESSION.get(url, params=params)
+        if response.status_code != 200:
+            return response, items
+        
+        result = orjson.loads(response.content)
+        items.extend(result[key])
+        if result.get("next_cursor"):
+            params = {"after": result["next_cursor"], "per_page": MAX_PER_PAGE}
+        elif "next_cursor" not in result and result[key] and len(items) < result["total"]:
+            params["page"] += 1
+        else:
+            return response, items
+
 def test_health_check():
     """Test the health check endpoint."""
     print("🏥 Testing health check...")
-    response = requests.get("http://localhost:8000/health")
+    response = SESSION.get("http://localhost:8000/health")
     print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    print(f"Response: {orjson.loads(response.content)}")
     print()
 
 def test_api_info():
     """Test the API info endpoint."""
     print("🏠 Testing API info endpoint...")
-    response = requests.get("http://localhost:8000/api")
+    response = SESSION.get("http://localhost:8000/api")
     print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    print(f"Response: {orjson.loads(response.content)}")
     print()
 
 def test_create_payment():
@@ -30,7 +66,7 @@ def test_create_payment():
     print("💳 Testing payment creation...")
     
     payment_data = {
-        "amount": 20.00,
+        "amount": 2000,  # cents
         "currency": "eur",
         "description": "Test payment for API demonstration",
         "payment_method": "card",
@@ -41,16 +77,17 @@ def test_create_payment():
         }
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/payments/create",
-        json=payment_data
+        data=orjson.dumps(payment_data),
+        headers=JSON_HEADERS
     )
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"✅ Payment created: {result['payment']['id']}")
-        print(f"   Amount: €{result['payment']['amount']} {result['payment']['currency']}")
+        print(f"   Amount: €{result['payment']['amount'] / 100:.2f} {result['payment']['currency']}")
         print(f"   Status: {result['payment']['status']}")
         return result['payment']['id']
     else:
@@ -63,13 +100,13 @@ def test_get_payment(payment_id):
         return
     
     print(f"📋 Testing get payment {payment_id}...")
-    response = requests.get(f"{BASE_URL}/payments/{payment_id}")
+    response = SESSION.get(f"{BASE_URL}/payments/{payment_id}")
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        payment = response.json()
+        payment = orjson.loads(response.content)
         print(f"✅ Payment details:")
-        print(f"   Amount: €{payment['amount']} {payment['currency']}")
+        print(f"   Amount: €{payment['amount'] / 100:.2f} {payment['currency']}")
         print(f"   Status: {payment['status']}")
         print(f"   Description: {payment['description']}")
     else:
@@ -79,18 +116,16 @@ def test_get_payment(payment_id):
 def test_list_payments():
     """Test listing payments."""
     print("📝 Testing list payments...")
-    response = requests.get(f"{BASE_URL}/payments/")
+    response, payments = fetch_all(f"{BASE_URL}/payments/", "payments")
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
-        print(f"✅ Total payments: {result['total']}")
-        print(f"   Payments on page: {len(result['payments'])}")
+        print(f"✅ Total payments: {len(payments)}")
         
-        if result['payments']:
+        if payments:
             print("   Recent payments:")
-            for payment in result['payments'][:3]:  # Show first 3
-                print(f"     - {payment['id'][:8]}... €{payment['amount']} {payment['currency']} ({payment['status']})")
+            for payment in payments[:3]:  # Show first 3
+                print(f"     - {payment['id'][:8]}... €{payment['amount'] / 100:.2f} {payment['currency']} ({payment['status']})")
     else:
         print(f"❌ Error: {response.text}")
     print()
@@ -99,7 +134,7 @@ def test_list_payments():
 # def test_payment_cabinet():
 #     """Test the payment cabinet HTML page."""
 #     print("🏢 Testing payment cabinet...")
-#     response = requests.get(f"{BASE_URL}/payments/cabinet")
+#     response = SESSION.get(f"{BASE_URL}/payments/cabinet")
 #     
 #     print(f"Status: {response.status_code}")
 #     if response.status_code == 200:
@@ -126,14 +161,15 @@ def test_create_subscription():
         }
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/subscriptions/create",
-        json=subscription_data
+        data=orjson.dumps(subscription_data),
+        headers=JSON_HEADERS
     )
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"✅ Subscription created: {result['subscription']['id']}")
         print(f"   Customer: {result['subscription']['customer_id']}")
         print(f"   Status: {result['subscription']['status']}")
@@ -145,13 +181,11 @@ def test_create_subscription():
 def test_list_subscriptions():
     """Test listing subscriptions."""
     print("📋 Testing list subscriptions...")
-    response = requests.get(f"{BASE_URL}/subscriptions/")
+    response, subscriptions = fetch_all(f"{BASE_URL}/subscriptions/", "subscriptions")
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
-        print(f"✅ Total subscriptions: {result['total']}")
-        print(f"   Subscriptions on page: {len(result['subscriptions'])}")
+        print(f"✅ Total subscriptions: {len(subscriptions)}")
     else:
         print(f"❌ Error: {response.text}")
     print()
@@ -3,19 +3,28 @@
 Simple test script to demonstrate the Stripe B2B Payments API functionality.
 This script shows how to use the API endpoints.
 """
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
 from decimal import Decimal
 
 # API base URL
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One pooled session for every call, so connections are kept alive between tests
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Bodies are encoded with orjson, so the content type has to be set by hand
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 def test_health_check():
     """Test the health check endpoint."""
     print("Testing health check...")
-    response = requests.get("http://localhost:8000/health")
+    response = SESSION.get("http://localhost:8000/health")
     print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    print(f"Response: {orjson.loads(response.content)}")
     print()
 
 def test_create_payment():
@@ -23,7 +32,7 @@ def test_create_payment():
     print("Testing payment creation...")
     
     payment_data = {
-        "amount": 20.00,  # Use float instead of Decimal for JSON serialization
+        "amount": 2000,  # cents
         "currency": "eur",
         "description": "Test payment for API demonstration",
         "payment_method": "card",
@@ -34,14 +43,15 @@ def test_create_payment():
         }
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/payments/create",
-        json=payment_data
+        data=orjson.dumps(payment_data),
+        headers=JSON_HEADERS
     )
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"Payment created: {result['payment']['id']}")
         return result['payment']['id']
     else:
@@ -54,12 +64,12 @@ def test_get_payment(payment_id):
         return
     
     print(f"Testing get payment {payment_id}...")
-    response = requests.get(f"{BASE_URL}/payments/{payment_id}")
+    response = SESSION.get(f"{BASE_URL}/payments/{payment_id}")
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        payment = response.json()
-        print(f"Payment amount: ${payment['amount']} {payment['currency']}")
+        payment = orjson.loads(response.content)
+        print(f"Payment amount: {payment['amount'] / 100:.2f} {payment['currency']}")
         print(f"Payment status: {payment['status']}")
     else:
         print(f"Error: {response.text}")
@@ -68,11 +78,11 @@ def test_get_payment(payment_id):
 def test_list_payments():
     """Test listing payments."""
     print("Testing list payments...")
-    response = requests.get(f"{BASE_URL}/payments/")
+    response = SESSION.get(f"{BASE_URL}/payments/")
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"Total payments: {result['total']}")
         print(f"Payments on page: {len(result['payments'])}")
     else:
@@ -95,14 +105,15 @@ def test_create_subscription():
         }
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/subscriptions/create",
-        json=subscription_data
+        data=orjson.dumps(subscription_data),
+        headers=JSON_HEADERS
     )
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"Subscription created: {result['subscription']['id']}")
         return result['subscription']['id']
     else:
@@ -116,18 +127,19 @@ def test_create_refund():
     # Note: This requires a valid payment_intent_id from Stripe
     refund_data = {
         "payment_intent_id": "pi_test_payment_intent",  # Replace with actual Stripe payment intent ID
-        "amount": 10.00,  # Use float instead of Decimal for JSON serialization
+        "amount": 1000,  # cents
         "reason": "requested_by_customer"
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/refunds/create",
-        json=refund_data
+        data=orjson.dumps(refund_data),
+        headers=JSON_HEADERS
     )
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"Refund created: {result['refund']['id']}")
     else:
         print(f"Error: {response.text}")
@@ -136,7 +148,7 @@ def test_create_refund():
 def test_oauth_flow():
     """Test OAuth flow initiation."""
     print("Testing OAuth flow initiation...")
-    response = requests.get(f"{BASE_URL}/connect/oauth", allow_redirects=False)
+    response = SESSION.get(f"{BASE_URL}/connect/oauth", allow_redirects=False)
     
     print(f"Status: {response.status_code}")
     if response.status_code == 307:  # Redirect
@@ -0,0 +1,50 @@
+"""
+Both refund repositories must return the same refunds for the same query.
+"""
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.models.refund import RefundResponse
+from app.repositories.refund_repository import (
+    InMemoryRefundRepository,
+    RedisRefundRepository,
+    RefundRepository
+)
+
+
+def _refund(index: int, payment_intent_id: str) -> RefundResponse:
+    return RefundResponse(
+        id=f"re_{index}",
+        payment_intent_id=payment_intent_id,
+        amount=100 + index,
+        currency="eur",
+        status="succeeded",
+        created_at=1_700_000_000 + index
+    )
+
+
+def _list_ids(repository: RefundRepository, payment_intent_id, limit: int) -> list[str]:
+    async def run() -> list[str]:
+        for index in range(5):
+            await repository.add(_refund(index, "pi_a" if index % 2 else "pi_b"))
+        refunds = await repository.list_latest(payment_intent_id=payment_intent_id, limit=limit)
+        return [refund.id for refund in refunds]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("payment_intent_id", [None, "pi_a", "pi_missing"])
+@pytest.mark.parametrize("limit", [0, 1, 2, 5, 10])
+def test_backends_agree(payment_intent_id, limit):
+    in_memory = _list_ids(InMemoryRefundRepository(), payment_intent_id, limit)
+    redis = _list_ids(RedisRefundRepository(fakeredis.FakeAsyncRedis()), payment_intent_id, limit)
+
+    assert redis == in_memory
+    assert len(in_memory) <= limit
+
+
+def test_newest_first():
+    assert _list_ids(InMemoryRefundRepository(), None, 3) == ["re_4", "re_3", "re_2"]
+    assert _list_ids(InMemoryRefundRepository(), "pi_a", 10) == ["re_3", "re_1"]